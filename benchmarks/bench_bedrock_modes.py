@@ -0,0 +1,150 @@
+"""
+Compares the two-step Bedrock extraction (company call + detail call)
+with the single combined call on a recorded corpus of LeetCode posts.
+
+Record a corpus once (JSONL, one {"title", "content"} per line; an
+optional "expected": {"is_interview_experience", "company_name"} adds
+labelled accuracy):
+
+    python3 benchmarks/bench_bedrock_modes.py --record corpus.jsonl --limit 50
+
+Then benchmark (this calls Bedrock; the result cache is bypassed):
+
+    python3 benchmarks/bench_bedrock_modes.py corpus.jsonl
+
+Job roles are resolved per post from Postgres, as the scraper does: the
+company the two-step run extracts is looked up (or created) and its roles
+are used by both modes, so job-role agreement compares like with like.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "lc_interview_experience_scrapper"))
+
+from bedrock_client import BedrockProcessor, match_job_role
+
+
+def record(path, limit):
+    from lc_client import LeetCodeClient
+
+    client = LeetCodeClient()
+    data = client.fetch_discussion_posts(limit=limit, skip=0, order_by="MOST_RECENT")
+    edges = data["data"]["ugcArticleDiscussionArticles"]["edges"] if data else []
+    with open(path, "w") as f:
+        for edge in edges:
+            node = edge["node"]
+            url = f"https://leetcode.com/discuss/post/{node['topicId']}/"
+            content, _ = client.resolve_post_content(node, url)
+            if content:
+                f.write(json.dumps({"uuid": node["uuid"], "title": node["title"], "content": content}) + "\n")
+    print(f"Recorded {len(edges)} posts to {path}")
+
+
+def role_resolver(pg_db):
+    """company name -> that company's job roles, the way PostProcessor.classify looks them up."""
+    roles = {}
+
+    def roles_for(company_name):
+        slug = company_name.lower().replace(" ", "-")
+        if slug not in roles:
+            company = pg_db.get_or_create_company(company_name, slug)
+            roles[slug] = pg_db.get_job_roles_for_company(company["id"])
+        return roles[slug]
+
+    return roles_for
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def run_mode(processor, posts, mode, roles_for):
+    """
+    Returns per-post results and the call stats for one extraction mode.
+    The two-step run (which goes first) resolves each post's job roles from
+    the company it extracts and passes them to its detail prompt; the
+    combined run matches its role name against the same roles afterwards,
+    falling back to its own company when two-step found none.
+    """
+    processor.call_stats = {"calls": 0, "cached": 0, "latency": 0.0, "input_tokens": 0, "output_tokens": 0}
+    results, latencies = [], []
+    for post in posts:
+        start = time.monotonic()
+        if mode == "combined":
+            result = dict(processor.extract_combined(post["title"], post["content"]) or {})
+            if result.get("is_interview_experience") and result.get("company_name"):
+                job_roles = post.get("job_roles") or roles_for(result["company_name"])
+                matched = match_job_role(job_roles, result.get("job_role_name"))
+                result["job_role_id"] = matched["id"] if matched else None
+        else:
+            result = dict(processor.extract_company_info(post["title"], post["content"]) or {})
+            if result.get("is_interview_experience") and result.get("company_name"):
+                post["job_roles"] = roles_for(result["company_name"])
+                details = processor.extract_interview_details(post["title"], post["content"], post["job_roles"])
+                result.update(details or {})
+        latencies.append(time.monotonic() - start)
+        results.append(result)
+    return results, latencies, dict(processor.call_stats)
+
+
+def same_company(a, b):
+    return (a or "").strip().lower() == (b or "").strip().lower()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("corpus", nargs="?")
+    parser.add_argument("--record", help="Write a corpus of recent posts to this path and exit.")
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.limit)
+        return
+    if not args.corpus:
+        parser.error("corpus path required")
+
+    with open(args.corpus) as f:
+        posts = [json.loads(line) for line in f if line.strip()][:args.limit]
+
+    processor = BedrockProcessor()
+    processor.cache = None  # measure real calls
+
+    from utils.postgres_db import PostgresDB
+
+    roles_for = role_resolver(PostgresDB())
+    runs = {mode: run_mode(processor, posts, mode, roles_for) for mode in ("two_step", "combined")}
+
+    print(f"{'mode':<10} {'calls':>6} {'p50 s':>8} {'p95 s':>8} {'mean s':>8} {'in tok':>9} {'out tok':>9}")
+    for mode, (_, latencies, stats) in runs.items():
+        print(f"{mode:<10} {stats['calls']:>6} {percentile(latencies, 50):>8.2f} {percentile(latencies, 95):>8.2f} "
+              f"{statistics.mean(latencies) if latencies else 0:>8.2f} {stats['input_tokens']:>9} {stats['output_tokens']:>9}")
+
+    two_step, combined = runs["two_step"][0], runs["combined"][0]
+    n = len(posts) or 1
+    agree_class = sum(bool(a.get("is_interview_experience")) == bool(b.get("is_interview_experience")) for a, b in zip(two_step, combined))
+    agree_company = sum(same_company(a.get("company_name"), b.get("company_name")) for a, b in zip(two_step, combined))
+    agree_role = sum(a.get("job_role_id") == b.get("job_role_id") for a, b in zip(two_step, combined))
+    agree_rounds = sum(len(a.get("interview_rounds") or []) == len(b.get("interview_rounds") or []) for a, b in zip(two_step, combined))
+    print(f"\nAgreement combined vs two_step: classification {agree_class}/{n}, company {agree_company}/{n}, "
+          f"job role {agree_role}/{n}, round count {agree_rounds}/{n}")
+
+    labelled = [(i, p["expected"]) for i, p in enumerate(posts) if p.get("expected")]
+    if labelled:
+        for mode, (results, _, _) in runs.items():
+            correct_class = sum(bool(results[i].get("is_interview_experience")) == bool(exp.get("is_interview_experience")) for i, exp in labelled)
+            correct_company = sum(same_company(results[i].get("company_name"), exp.get("company_name")) for i, exp in labelled)
+            print(f"{mode:<10} accuracy on {len(labelled)} labelled: classification {correct_class}, company {correct_company}")
+
+
+if __name__ == "__main__":
+    main()
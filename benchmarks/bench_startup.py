@@ -0,0 +1,132 @@
+"""
+Measures how long each entry point takes to import, using python's
+-X importtime, and fails when that regresses past the budget in
+benchmarks/startup_budget.json or when a heavy dependency that should only
+load on first use (pandas, boto3, psycopg2, ...) is imported at startup.
+
+    python3 benchmarks/bench_startup.py [--runs 5] [--top 10]
+    python3 benchmarks/bench_startup.py --update   # re-baseline the budget
+
+Each run is a fresh interpreter importing the entry module against a
+throwaway config (SCRAPER_CONFIG), so nothing connects anywhere. The
+budget is the median import time plus headroom; exit status is 1 on any
+regression, so this can gate CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BUDGET_PATH = os.path.join(os.path.dirname(__file__), "startup_budget.json")
+
+# name -> (directory the entry point runs from, module it starts with)
+ENTRY_POINTS = {
+    "job_bot": ("job_scrapper", "bot"),
+    "lc_scraper": ("lc_interview_experience_scrapper", "main"),
+}
+
+# Loaded on first use only; any of these at startup is a regression.
+LAZY_MODULES = ["pandas", "jobspy", "boto3", "botocore", "psycopg2", "tls_client", "bs4", "lxml", "selectolax"]
+
+# --update sets each budget to the measured median times this.
+HEADROOM = 1.3
+
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def import_once(entry, config_path):
+    directory, module = ENTRY_POINTS[entry]
+    env = dict(os.environ, SCRAPER_CONFIG=config_path)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.join(ROOT, directory), env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+    modules = parse_importtime(result.stderr)
+    return modules[module][1] / 1000, modules
+
+
+def measure(entry, config_path, runs):
+    # One untimed run first so every timed run sees warm .pyc files.
+    import_once(entry, config_path)
+    times, modules = [], {}
+    for _ in range(runs):
+        elapsed, modules = import_once(entry, config_path)
+        times.append(elapsed)
+    return statistics.median(times), modules
+
+
+def top_packages(modules, n):
+    """The n top-level packages with the most self time, summed over their submodules."""
+    totals = {}
+    for name, (self_us, _) in modules.items():
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest packages to list per entry point.")
+    parser.add_argument("--update", action="store_true", help="Write the measured times (plus headroom) as the new budget.")
+    args = parser.parse_args()
+
+    budget = {}
+    if os.path.exists(BUDGET_PATH):
+        with open(BUDGET_PATH) as f:
+            budget = json.load(f)
+
+    failures = []
+    measured = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "config.json")
+        with open(config_path, "w") as f:
+            json.dump({"discord_token": "", "channel_id": 0, "http_cache": {"directory": os.path.join(tmp, "http_cache")}}, f)
+
+        for entry in ENTRY_POINTS:
+            median_ms, modules = measure(entry, config_path, args.runs)
+            measured[entry] = median_ms
+            limit = budget.get(entry)
+            if limit is None:
+                verdict = "no budget"
+            else:
+                verdict = f"budget {limit:.0f} ms, {'ok' if median_ms <= limit else 'OVER BUDGET'}"
+            print(f"{entry}: {median_ms:.0f} ms median of {args.runs} ({verdict})")
+            for package, self_us in top_packages(modules, args.top):
+                print(f"    {self_us / 1000:>8.1f} ms  {package}")
+
+            eager = sorted({name.split(".")[0] for name in modules} & set(LAZY_MODULES))
+            if eager:
+                failures.append(f"{entry} imports {', '.join(eager)} at startup")
+            if limit is not None and median_ms > limit:
+                failures.append(f"{entry} took {median_ms:.0f} ms, budget {limit:.0f} ms")
+            print()
+
+    if args.update:
+        with open(BUDGET_PATH, "w") as f:
+            json.dump({entry: round(ms * HEADROOM) for entry, ms in measured.items()}, f, indent=2)
+            f.write("\n")
+        print(f"Budget written to {BUDGET_PATH}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
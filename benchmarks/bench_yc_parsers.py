@@ -0,0 +1,107 @@
+"""
+Compares the YC job-page parser backends (job_scrapper/yc_scraper.py) on
+saved HTML fixtures: cards parsed per second and peak Python memory.
+
+Save fixtures once (one .html per role; this fetches from YC):
+
+    python3 benchmarks/bench_yc_parsers.py --record yc_fixtures --roles software-engineer designer
+
+Then benchmark offline:
+
+    python3 benchmarks/bench_yc_parsers.py yc_fixtures [--repeat 20]
+
+Peak memory comes from tracemalloc, which only sees allocations made
+through Python's allocator; the C parsers' own trees are mostly invisible
+to it, so compare their numbers with that in mind.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "job_scrapper"))
+
+import yc_scraper
+
+
+def record(directory, roles):
+    import requests
+
+    os.makedirs(directory, exist_ok=True)
+    for role in roles:
+        response = requests.get(
+            f"https://www.ycombinator.com/jobs/role/{role}",
+            headers={"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"}
+        )
+        response.raise_for_status()
+        path = os.path.join(directory, f"{role}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(response.text)
+        print(f"Saved {path} ({len(response.text)} bytes)")
+
+
+def run_backend(backend, pages, repeat):
+    parse = yc_scraper.BACKENDS[backend]
+    cards = sum(len(parse(page) or []) for page in pages)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            parse(page)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for page in pages:
+        parse(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cards, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("fixtures", nargs="?")
+    parser.add_argument("--record", help="Save fixtures for --roles into this directory and exit.")
+    parser.add_argument("--roles", nargs="+", default=["software-engineer"])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.roles)
+        return
+    if not args.fixtures:
+        parser.error("fixtures directory required")
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(args.fixtures, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    if not pages:
+        parser.error(f"no .html fixtures in {args.fixtures}")
+    print(f"{len(pages)} pages, {sum(len(p) for p in pages) / 1024:.0f} KiB, {args.repeat} passes\n")
+
+    rows = {}
+    for backend in yc_scraper.available_backends():
+        cards, elapsed, peak = run_backend(backend, pages, args.repeat)
+        ids = [[job.id for job in yc_scraper.BACKENDS[backend](page) or []] for page in pages]
+        rows[backend] = (cards, elapsed, peak, ids)
+
+    # The original html.parser backend is the reference for correctness.
+    reference = rows["bs4"][3]
+    print(f"{'backend':<12} {'cards':>6} {'cards/s':>10} {'ms/page':>9} {'peak KiB':>9}  same jobs as bs4")
+    for backend, (cards, elapsed, peak, ids) in rows.items():
+        rate = cards * args.repeat / elapsed if elapsed else 0
+        per_page = elapsed / (args.repeat * len(pages)) * 1000
+        # The JSON backend only covers pages that embed a payload.
+        covered = [i for i, page_ids in enumerate(ids) if page_ids]
+        same = all(ids[i] == reference[i] for i in covered)
+        print(f"{backend:<12} {cards:>6} {rate:>10.0f} {per_page:>9.2f} {peak / 1024:>9.0f}  "
+              f"{'yes' if same else 'NO'} ({len(covered)}/{len(pages)} pages)")
+
+
+if __name__ == "__main__":
+    main()
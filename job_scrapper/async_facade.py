@@ -0,0 +1,104 @@
+"""
+Async wrappers for the job bot's blocking calls (the YC scraper, SQLite),
+so the discord.py event loop never waits on them, plus a monitor that
+measures how long the loop was blocked anyway. JobSpy scrapes go through
+fanout.SiteFanOut.
+"""
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from yc_scraper import scrape_yc_jobs as _scrape_yc_jobs, merge_unique
+from utils import database
+
+# One thread for SQLite keeps writes in submission order; YC scrapes get their own pool.
+_db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+_scrape_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="scrape-io")
+
+
+async def _run(executor, fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+
+async def run_db(fn, *args, **kwargs):
+    """Runs any database (or other SQLite-backed) call on the database thread."""
+    return await _run(_db_executor, fn, *args, **kwargs)
+
+
+async def init_db():
+    return await run_db(database.init_db)
+
+
+async def record_new_jobs(jobs):
+    return await run_db(database.record_new_jobs, jobs)
+
+
+async def cache_stats():
+    return await run_db(database.cache_stats)
+
+
+async def scrape_yc_many(roles, locations=None):
+    """
+    Scrapes every role x location page concurrently (yc_scraper caps
+    requests per host) and yields ((role, location), jobs) as pages
+    finish. A job listed on several pages is only yielded the first time.
+    """
+    loop = asyncio.get_running_loop()
+    futures = {}
+    for role in roles:
+        for location in locations or [None]:
+            future = loop.run_in_executor(_scrape_executor, _scrape_yc_jobs, role, location)
+            futures[future] = (role, location)
+    seen_ids = set()
+    pending = set(futures)
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for future in done:
+            yield futures[future], merge_unique(seen_ids, future.result())
+
+
+class LoopLagMonitor:
+    """
+    Wakes every `interval` seconds and records how late it woke up. The
+    lateness is time the loop spent running something else without
+    yielding, i.e. blocking calls that starve the gateway heartbeat.
+    """
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.task = None
+        self.reset()
+
+    def reset(self):
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.blocked_over_1s = 0
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self._watch())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+
+    async def _watch(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - expected)
+            self.samples += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+            self.blocked_over_1s += lag >= 1.0
+
+    def summary(self):
+        return {
+            "samples": self.samples,
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "avg_lag_ms": round(self.total_lag / self.samples * 1000, 2) if self.samples else 0.0,
+            "blocked_over_1s": self.blocked_over_1s,
+        }
@@ -1,22 +1,19 @@
 import discord
 from discord.ext import tasks, commands
 import os
-import asyncio
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-import scraper
 from scraper import fetch_jobs
-from yc_scraper import scrape_yc_jobs
-from utils import database
-
-import json
+from fanout import SiteFanOut
+import async_facade as aio
+from utils.discord_service import get_sender
+from utils.discord_delivery import DeliveryQueue
+from utils.http_cache import shared_cache
+from utils.settings import get_settings
 
 # --- CONFIGURATION ---
-try:
-    config_path = os.path.join(os.path.dirname(__file__), '..', 'utils', 'config.json')
-    with open(config_path, "r") as f:
-        config = json.load(f)
-except FileNotFoundError:
+config = get_settings()
+if not config.found:
     print("Error: config.json not found.")
     exit(1)
 
@@ -36,22 +33,46 @@ SITES = config.get("sites", ["linkedin"])
 
 SCRAPE_INTERVAL_HOURS = config.get("scrape_interval_hours", 6)
 
+# Optional YC location slugs ("remote", "san-francisco-bay-area", ...);
+# empty scrapes each role's main page only.
+YC_LOCATIONS = config.get("yc_locations", [])
+
+# Job-board scrapes run in a bounded pool off the event loop; each site has
+# its own concurrency cap and a politeness delay between the starts of its calls.
+FANOUT_CONFIG = config.get("job_fanout", {})
+fanout = SiteFanOut(
+    max_workers=FANOUT_CONFIG.get("max_workers", 6),
+    site_concurrency=FANOUT_CONFIG.get("site_concurrency", {"linkedin": 1}),
+    site_delay_seconds=FANOUT_CONFIG.get("site_delay_seconds", {"linkedin": 5})
+)
+
+# New-job embeds go through a persistent outbox that packs up to 10 per
+# message and follows Discord's rate-limit headers. It is opened in
+# on_ready, so importing this module touches no files.
+outbox = None
+
 # Initialize Bot
 intents = discord.Intents.default()
 intents.message_content = True
 bot = commands.Bot(command_prefix="!", intents=intents)
+loop_monitor = aio.LoopLagMonitor()
 
 @bot.event
 async def on_ready():
+    global outbox
     print(f'Logged in as {bot.user} (ID: {bot.user.id})')
-    database.init_db()
+    loop_monitor.start()
+    await aio.init_db()
     print("Database initialized.")
+    if outbox is None:
+        outbox = await aio.run_db(DeliveryQueue, get_sender())
     if not job_scraper_task.is_running():
         job_scraper_task.start()
 
 @tasks.loop(hours=SCRAPE_INTERVAL_HOURS)
 async def job_scraper_task():
     print("Starting scheduled scrape...")
+    loop_monitor.reset()
     channel = bot.get_channel(CHANNEL_ID)
     
     if not channel:
@@ -59,51 +80,41 @@ async def job_scraper_task():
         return
 
     new_jobs_count = 0
-    for location in LOCATIONS:
-        for term in SEARCH_TERMS:
-            print(f"Scraping for '{term}' in '{location}'...")
-            # Exclude ycombinator from jobspy sites as it is handled separately
-            jobspy_sites = [s for s in SITES if s != "ycombinator"]
-            if jobspy_sites:
-                jobs = fetch_jobs(search_term=term, location=location, jobs_to_fetch=10, site_name=jobspy_sites)
-            else:
-                jobs = []
-            
-            new_jobs_count_for_term = 0
-            for job in jobs:
-                # jobspy returns somewhat messy data sometimes, ensure we have keys
-                job_id = job.get('id')
+    # Exclude ycombinator from jobspy sites as it is handled separately.
+    # One task per site so each board gets its own concurrency cap.
+    jobspy_sites = [s for s in SITES if s != "ycombinator"]
+    combos = [(term, location, site) for location in LOCATIONS for term in SEARCH_TERMS for site in jobspy_sites]
+    print(f"Scraping {len(combos)} term/location/site combinations...")
+
+    def fetch(term, location, site):
+        return fetch_jobs(search_term=term, location=location, jobs_to_fetch=10, site_name=[site])
+
+    async for (term, location, site), jobs in fanout.run(combos, fetch):
+        # fetch_jobs has already filled in missing IDs, so job_key never sees one empty
+        new_jobs = await aio.record_new_jobs(jobs)
+        new_jobs_count_for_term = len(new_jobs)
+        new_jobs_count += new_jobs_count_for_term
+        embeds = []
+        for job in new_jobs:
+            # Create Embed
+            embed = discord.Embed(
+                title=job.title or 'Unknown Title',
+                url=job.job_url or '',
+                description=f"**Company:** {job.company or 'Unknown'}\n**Location:** {job.location or 'Unknown'}",
+                color=0x00ff00
+            )
+            if job.salary:
+                 embed.add_field(name="Salary", value=job.salary, inline=False)
                 
-                if not job_id:
-                    # Fallback if no ID, use title+company+url as unique enough hash
-                    job_id = f"{job.get('title')}-{job.get('company')}"
-
-                if not database.is_job_seen(job_id):
-                    database.add_job(job)
-                    new_jobs_count_for_term += 1
-                    new_jobs_count += 1
-                    
-                    # Create Embed
-                    embed = discord.Embed(
-                        title=job.get('title', 'Unknown Title'),
-                        url=job.get('job_url', ''),
-                        description=f"**Company:** {job.get('company', 'Unknown')}\n**Location:** {job.get('location', 'Unknown')}",
-                        color=0x00ff00
-                    )
-                    if job.get('salary_source'):
-                         embed.add_field(name="Salary", value=f"{job.get('min_amount')}-{job.get('max_amount')} {job.get('currency')}", inline=False)
-                    
-                    site_source = job.get('site', 'Unknown Source').capitalize()
-                    embed.set_footer(text=f"Source - {site_source}")
-
-                    try:
-                        await channel.send(embed=embed)
-                        await asyncio.sleep(1) # Rate limit protection for Discord
-                    except Exception as e:
-                        print(f"Failed to send message: {e}")
-            
-            print(f"Finished scraping '{term}' in '{location}'. Found {new_jobs_count_for_term} new jobs.")
-            await asyncio.sleep(5) # Polite delay between different search terms
+            site_source = (job.site or 'Unknown Source').capitalize()
+            embed.set_footer(text=f"Source - {site_source}")
+            embeds.append(embed.to_dict())
+
+        await aio.run_db(outbox.enqueue_many, CHANNEL_ID, embeds)
+        await outbox.flush_async()
+        
+        print(f"Finished scraping '{term}' in '{location}' on {site}. Found {new_jobs_count_for_term} new jobs.")
+    print(f"Scrape fan-out: {fanout.summary()}")
 
     # --- YCombinator Scraper Integration ---
     if "ycombinator" in SITES:
@@ -126,39 +137,37 @@ async def job_scraper_task():
                 # Default to software engineer for most technical terms
                 yc_roles.add("software-engineer")
         
-        for role in yc_roles:
-            print(f"Scraping YCombinator for role '{role}'...")
-            yc_jobs = scrape_yc_jobs(role=role)
-            new_yc_jobs_count = 0
-            
-            for job in yc_jobs:
-                 if not database.is_job_seen(job['id']):
-                    database.add_job(job)
-                    new_yc_jobs_count += 1
-                    new_jobs_count += 1
-                    
-                    # Create Embed
-                    embed = discord.Embed(
-                        title=job.get('title', 'Unknown Title'),
-                        url=job.get('job_url', ''),
-                        description=f"**Company:** {job.get('company', 'Unknown')}\n**Location:** {job.get('location', 'Unknown')}",
-                        color=0xff7f00 # Orange for YC
-                    )
-                    if job.get('salary_source'):
-                         embed.add_field(name="Salary", value=job.get('salary_source'), inline=False)
+        yc_locations = YC_LOCATIONS or [None]
+        print(f"Scraping YCombinator for roles {sorted(yc_roles)} in {yc_locations}...")
+        async for (role, location), yc_jobs in aio.scrape_yc_many(sorted(yc_roles), YC_LOCATIONS):
+            new_yc_jobs = await aio.record_new_jobs(yc_jobs)
+            new_yc_jobs_count = len(new_yc_jobs)
+            new_jobs_count += new_yc_jobs_count
+            embeds = []
+            for job in new_yc_jobs:
+                # Create Embed
+                embed = discord.Embed(
+                    title=job.title or 'Unknown Title',
+                    url=job.job_url or '',
+                    description=f"**Company:** {job.company or 'Unknown'}\n**Location:** {job.location or 'Unknown'}",
+                    color=0xff7f00 # Orange for YC
+                )
+                if job.salary:
+                     embed.add_field(name="Salary", value=job.salary, inline=False)
                     
-                    embed.set_footer(text=f"Source - YCombinator")
+                embed.set_footer(text=f"Source - YCombinator")
+                embeds.append(embed.to_dict())
 
-                    try:
-                        await channel.send(embed=embed)
-                        await asyncio.sleep(1)
-                    except Exception as e:
-                        print(f"Failed to send message: {e}")
+            await aio.run_db(outbox.enqueue_many, CHANNEL_ID, embeds)
+            await outbox.flush_async()
             
-            print(f"Finished scraping YCombinator '{role}'. Found {new_yc_jobs_count} new jobs.")
-            await asyncio.sleep(5)
+            print(f"Finished scraping YCombinator '{role}' ({location or 'all locations'}). Found {new_yc_jobs_count} new jobs.")
 
     print(f"Total job scrape finished. Posted {new_jobs_count} total new jobs across all categories.")
+    print(f"Seen-job cache: {(await aio.cache_stats())[0]}")
+    print(f"Discord delivery: {await aio.run_db(outbox.summary)}")
+    print(f"Event loop lag: {loop_monitor.summary()}")
+    print(f"HTTP cache: {shared_cache().summary()}")
 
 @job_scraper_task.before_loop
 async def before_job_scraper_task():
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SiteFanOut:
+    """
+    Runs blocking scrape calls for a (search term, location, site) matrix
+    on a bounded thread pool, off the event loop.
+
+    Each site has its own cap on concurrent calls and a politeness delay
+    between the starts of its calls, so a slow or strict board (LinkedIn)
+    is throttled without holding back the others. Both are enforced on the
+    event loop before a call is handed to the pool, so a pool thread only
+    ever runs a scrape and never waits on another site's limits. Threads
+    rather than processes: the work is network-bound and the results are
+    JobRecords that would otherwise need pickling.
+    """
+
+    def __init__(self, max_workers=6, site_concurrency=None, site_delay_seconds=None):
+        self.site_concurrency = {"default": 2, **(site_concurrency or {})}
+        self.site_delay_seconds = {"default": 2, **(site_delay_seconds or {})}
+        self.executor = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="scrape")
+        # Loop-side state: only touched from the event loop thread.
+        self.semaphores = {}
+        self.next_start = {}
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def _site_slot(self, site):
+        if site not in self.semaphores:
+            limit = self.site_concurrency.get(site, self.site_concurrency["default"])
+            self.semaphores[site] = asyncio.Semaphore(max(1, int(limit)))
+        return self.semaphores[site]
+
+    def _start_delay(self, site, now):
+        """Books the site's next start time and returns how long to wait for it."""
+        start_at = max(now, self.next_start.get(site, now))
+        self.next_start[site] = start_at + self.site_delay_seconds.get(site, self.site_delay_seconds["default"])
+        return start_at - now
+
+    def _record(self, site, elapsed, error):
+        with self.lock:
+            entry = self.stats.setdefault(site, {"calls": 0, "errors": 0, "busy_seconds": 0.0})
+            entry["calls"] += 1
+            entry["errors"] += int(error)
+            entry["busy_seconds"] += elapsed
+
+    def _call(self, fn, term, location, site):
+        start = time.monotonic()
+        error = False
+        try:
+            return fn(term, location, site)
+        except Exception as e:
+            error = True
+            print(f"Scrape failed for '{term}' in '{location}' on {site}: {e}")
+            return []
+        finally:
+            self._record(site, time.monotonic() - start, error)
+
+    async def _run_one(self, fn, term, location, site):
+        loop = asyncio.get_running_loop()
+        await asyncio.sleep(self._start_delay(site, loop.time()))
+        async with self._site_slot(site):
+            return await loop.run_in_executor(self.executor, self._call, fn, term, location, site)
+
+    async def run(self, combos, fn):
+        """
+        Runs fn(term, location, site) for every combo and yields
+        ((term, location, site), result) as each finishes. summary()
+        covers the most recent run only.
+        """
+        with self.lock:
+            self.stats = {}
+        tasks = {asyncio.ensure_future(self._run_one(fn, *combo)): combo for combo in combos}
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield tasks[task], task.result()
+
+    def summary(self):
+        with self.lock:
+            return {site: dict(entry) for site, entry in self.stats.items()}
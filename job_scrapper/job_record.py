@@ -0,0 +1,35 @@
+class JobRecord:
+    """
+    One scraped job, from JobSpy or YC: just the fields the bot stores and
+    posts. With __slots__ a record is a fixed set of attribute slots rather
+    than a dict carrying every column JobSpy returns (full descriptions
+    included), so a cycle's worth of jobs stays small.
+
+    `id` is never empty; sources fall back to "<title>-<company>" when
+    the board gives no ID. `salary` is display-ready text or None.
+    """
+
+    __slots__ = ("id", "title", "company", "location", "job_url", "site", "salary")
+
+    def __init__(self, id: str, title: str, company: str, location: str, job_url: str, site: str, salary: str | None = None):
+        self.id = id
+        self.title = title
+        self.company = company
+        self.location = location
+        self.job_url = job_url
+        self.site = site
+        self.salary = salary
+
+    def to_list(self):
+        """Field values in slot order; JobRecord(*values) rebuilds the record."""
+        return [getattr(self, field) for field in self.__slots__]
+
+    def __eq__(self, other):
+        return isinstance(other, JobRecord) and self.to_list() == other.to_list()
+
+    def __hash__(self):
+        # Equal records share an id, so hashing on it alone stays consistent with __eq__.
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"JobRecord(id={self.id!r}, title={self.title!r}, company={self.company!r}, site={self.site!r})"
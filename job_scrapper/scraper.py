@@ -1,15 +1,61 @@
-from jobspy import scrape_jobs
-import pandas as pd
+from job_record import JobRecord
+
+# The JobSpy columns a JobRecord is built from; everything else
+# (descriptions, emails, logos, ...) is dropped before any per-row work.
+JOBSPY_COLUMNS = ["id", "title", "company", "location", "job_url", "site",
+                  "salary_source", "min_amount", "max_amount", "currency"]
+
+
+def _format_amounts(amounts):
+    """Numeric column -> whole-number strings, e.g. 120000.0 -> "120000" (missing stays missing)."""
+    import pandas as pd
+
+    return pd.to_numeric(amounts, errors="coerce").round().astype("Int64").astype("string")
+
+
+def records_from_frame(jobs):
+    """
+    Builds JobRecords from a JobSpy DataFrame with column-wise operations:
+    project to the columns the bot uses, fill in missing IDs and format the
+    salary range, then create one record per row.
+    """
+    frame = jobs.reindex(columns=JOBSPY_COLUMNS)
+
+    # Salary text only where JobSpy reported a salary; a one-sided range
+    # shows the single amount.
+    low = frame["min_amount"].fillna(frame["max_amount"])
+    high = frame["max_amount"].fillna(frame["min_amount"])
+    low_text, high_text = _format_amounts(low), _format_amounts(high)
+    salary = low_text.where(low_text == high_text, low_text + "-" + high_text)
+    salary = (salary + " " + frame["currency"].fillna("").astype("string")).str.strip()
+    salary = salary.astype(object).where(frame["salary_source"].notna() & low.notna(), None)
+
+    frame = frame.astype(object).where(frame.notna(), None)
+    # Same fallback key as before: "<title>-<company>" when the board gives no ID.
+    fallback_ids = frame["title"].fillna("None").astype(str) + "-" + frame["company"].fillna("None").astype(str)
+    has_id = frame["id"].notna() & frame["id"].ne("")
+    ids = frame["id"].where(has_id, fallback_ids).astype(str)
+
+    return [
+        JobRecord(*fields)
+        for fields in zip(ids.tolist(), frame["title"].tolist(), frame["company"].tolist(), frame["location"].tolist(),
+                          frame["job_url"].tolist(), frame["site"].tolist(), salary.tolist())
+    ]
+
 
 def fetch_jobs(search_term="Software Engineer", location="San Francisco, CA", jobs_to_fetch=20, site_name=["linkedin"]):
     """
     Fetches jobs from specified sites using JobSpy.
-    Returns a list of dictionaries.
+    Returns a list of JobRecords.
     """
+    # JobSpy pulls in pandas and its scraper stack; importing it here keeps
+    # that cost off bot startup and out of callers that never scrape.
+    from jobspy import scrape_jobs
+
     print(f"Scraping jobs for: {search_term} in {location} on {site_name}...")
-    
+
     try:
-        jobs: pd.DataFrame = scrape_jobs(
+        jobs = scrape_jobs(
             site_name=site_name,
             search_term=search_term,
             location=location,
@@ -17,13 +63,12 @@ def fetch_jobs(search_term="Software Engineer", location="San Francisco, CA", jo
             hours_old=24, # Only get recent jobs
             country_watchlist=["US", "Canada", "India"],
         )
-        
+
         if jobs.empty:
             print("No jobs found.")
             return []
 
-        # Convert DataFrame to a list of dictionaries
-        job_list = jobs.to_dict(orient='records')
+        job_list = records_from_frame(jobs)
         print(f"Found {len(job_list)} jobs.")
         return job_list
 
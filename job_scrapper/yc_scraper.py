@@ -1,104 +1,321 @@
 import requests
-from bs4 import BeautifulSoup
-import datetime
+import html as html_lib
+import json
+import os
+import re
+import sys
+import threading
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
 
-def scrape_yc_jobs(role="software-engineer", location=None):
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.http_cache import shared_cache
+from utils.settings import get_settings
+from job_record import JobRecord
+
+# Matches the 'li' container class observed
+CARD_CLASS = "my-2 flex h-auto w-full flex-col flex-nowrap rounded border border-[#ccc] bg-beige-lighter px-5 py-3"
+CARD_CLASS_TOKENS = frozenset(CARD_CLASS.split())
+DETAILS_CLASS_TOKENS = frozenset(["flex", "flex-wrap", "items-center", "gap-x-1"])
+NON_LOCATION_ITEMS = ['•', 'Full-time', 'Contract', 'Engineering', 'Product', 'Design']
+
+# Inertia-style pages carry the page props as JSON in a data-page attribute.
+DATA_PAGE = re.compile(r'data-page="([^"]*)"')
+
+config = get_settings()
+PARSER_BACKEND = config.get("yc_parser_backend", "auto")
+MAX_CONCURRENCY_PER_HOST = int(config.get("yc_max_concurrency", 4))
+
+
+def _has_classes(class_attr, tokens):
+    return tokens.issubset((class_attr or "").split())
+
+
+def build_job(title, href, company, details_text):
+    """Builds the JobRecord shared by every parser backend from one card's raw fields."""
+    job_url = "https://www.ycombinator.com" + href if href.startswith("/") else href
+
+    salary = None
+    location_text = "Remote" # Default
+    for item in details_text:
+        # Salary often contains '$' or '₹' or '€' or '£'
+        if any(currency in item for currency in ['$', '₹', '€', '£', 'K']):
+            salary = item
+        elif item not in NON_LOCATION_ITEMS:
+            # The last item is usually location in YC structure based on inspection
+            location_text = item
+
+    # Job ID from URL
+    # e.g. /companies/peakflo/jobs/StcNZf7-data-analyst-remote-india -> StcNZf7
+    job_img_id = job_url.split('/jobs/')[-1]
+
+    return JobRecord(
+        id=f"yc-{job_img_id}", # Prefix to avoid collision
+        title=title,
+        company=company or "Unknown Company",
+        location=location_text,
+        job_url=job_url,
+        site='ycombinator',
+        salary=salary
+    )
+
+
+def parse_bs4(page_html, features="html.parser"):
     """
-    Scrapes jobs from YCombinator based on role.
-    Note: 'location' is not directly used in the URL filter here as YC URL structure is role-based,
-    but we can filter results after scraping if strict location is needed.
+    BeautifulSoup backend. Only the job-card <li> elements are built into a
+    tree (SoupStrainer), so the rest of the page is tokenised but never
+    turned into objects.
     """
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    strainer = SoupStrainer('li', class_=lambda value: _has_classes(value, CARD_CLASS_TOKENS))
+    soup = BeautifulSoup(page_html, features, parse_only=strainer)
+    jobs = []
+    for card in soup.find_all('li'):
+        try:
+            # Title and Link
+            title_elem = card.select_one('a.text-linkColor')
+            if not title_elem:
+                continue
+            # Company name is usually in a bold span
+            company_elem = card.select_one('span.font-bold')
+            # Details (Location, Salary) are in a flex container with bullets
+            details_container = card.select_one('.flex.flex-wrap.items-center.gap-x-1')
+            details_text = [div.get_text(strip=True) for div in details_container.find_all('div', recursive=False)] if details_container else []
+            jobs.append(build_job(
+                title_elem.get_text(strip=True),
+                title_elem['href'],
+                company_elem.get_text(strip=True) if company_elem else None,
+                details_text
+            ))
+        except Exception as e:
+            print(f"Error parsing job card: {e}")
+    return jobs
+
+
+def parse_lxml(page_html):
+    """lxml backend: C parser plus class-token checks instead of CSS selector matching."""
+    from lxml import html as lxml_html
+
+    tree = lxml_html.fromstring(page_html)
+    jobs = []
+    for card in tree.iter('li'):
+        if not _has_classes(card.get('class'), CARD_CLASS_TOKENS):
+            continue
+        try:
+            title_elem = next((a for a in card.iter('a') if _has_classes(a.get('class'), {"text-linkColor"})), None)
+            if title_elem is None:
+                continue
+            company_elem = next((s for s in card.iter('span') if _has_classes(s.get('class'), {"font-bold"})), None)
+            details_container = next((d for d in card.iter() if d is not card and _has_classes(d.get('class'), DETAILS_CLASS_TOKENS)), None)
+            details_text = [div.text_content().strip() for div in details_container if div.tag == 'div'] if details_container is not None else []
+            jobs.append(build_job(
+                title_elem.text_content().strip(),
+                title_elem.get('href'),
+                company_elem.text_content().strip() if company_elem is not None else None,
+                details_text
+            ))
+        except Exception as e:
+            print(f"Error parsing job card: {e}")
+    return jobs
+
+
+def parse_selectolax(page_html):
+    """selectolax (lexbor) backend: the fastest C parser with CSS selectors."""
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(page_html)
+    jobs = []
+    for card in tree.css('li'):
+        if not _has_classes(card.attributes.get('class'), CARD_CLASS_TOKENS):
+            continue
+        try:
+            title_elem = card.css_first('a.text-linkColor')
+            if title_elem is None:
+                continue
+            company_elem = card.css_first('span.font-bold')
+            details_container = card.css_first('.flex.flex-wrap.items-center.gap-x-1')
+            details_text = []
+            if details_container is not None:
+                details_text = [child.text(strip=True) for child in details_container.iter() if child.tag == 'div']
+            jobs.append(build_job(
+                title_elem.text(strip=True),
+                title_elem.attributes.get('href'),
+                company_elem.text(strip=True) if company_elem is not None else None,
+                details_text
+            ))
+        except Exception as e:
+            print(f"Error parsing job card: {e}")
+    return jobs
+
+
+def _is_job_href(href):
+    return isinstance(href, str) and "/jobs/" in href
+
+
+def _find_postings(node):
+    """
+    Depth-first search for the first list of job postings in a JSON payload:
+    dicts with a title and a job-page url. Navigation and other link lists
+    also carry title/url pairs, so a list only counts when every url points
+    at a /jobs/ page.
+    """
+    if isinstance(node, list):
+        if node and all(isinstance(item, dict) and "title" in item and _is_job_href(item.get("url")) for item in node):
+            return node
+        for item in node:
+            found = _find_postings(item)
+            if found:
+                return found
+    elif isinstance(node, dict):
+        for value in node.values():
+            found = _find_postings(value)
+            if found:
+                return found
+    return None
+
+
+def parse_embedded_json(page_html):
+    """
+    Reads the job list from the JSON page props embedded in the HTML, when
+    the page has them, skipping HTML parsing entirely. Returns None when
+    there is no usable payload so callers can fall back to a markup parser.
+
+    Job IDs come from the posting's url through build_job, exactly as the
+    markup parsers derive them from the card's href, so switching backends
+    does not re-announce jobs already seen.
+    """
+    match = DATA_PAGE.search(page_html)
+    if not match:
+        return None
+    try:
+        payload = json.loads(html_lib.unescape(match.group(1)))
+    except ValueError:
+        return None
+    postings = _find_postings(payload)
+    if not postings:
+        return None
+
+    jobs = []
+    for posting in postings:
+        details = [value for value in (posting.get("salaryRange"), posting.get("location")) if value]
+        jobs.append(build_job(posting["title"], posting["url"], posting.get("companyName"), details))
+    return jobs
+
+
+BACKENDS = {
+    "json": parse_embedded_json,
+    "selectolax": parse_selectolax,
+    "lxml": parse_lxml,
+    "bs4-lxml": lambda page_html: parse_bs4(page_html, "lxml"),
+    "bs4": parse_bs4,
+}
+# Optional packages each backend needs beyond beautifulsoup4.
+BACKEND_MODULES = {"selectolax": "selectolax", "lxml": "lxml", "bs4-lxml": "lxml"}
+
+
+def backend_available(name):
+    module_name = BACKEND_MODULES.get(name)
+    if module_name is None:
+        return True
+    try:
+        __import__(module_name)
+        return True
+    except ImportError:
+        return False
+
+
+def available_backends():
+    return [name for name in BACKENDS if backend_available(name)]
+
+
+def parse_yc_jobs(page_html, backend=None):
+    """
+    Parses a YC jobs page with the named backend. "auto" uses the fastest
+    installed markup parser; the embedded-JSON backend depends on YC's page
+    props layout and is only used when configured explicitly.
+    """
+    backend = backend or PARSER_BACKEND
+    if backend != "auto":
+        return BACKENDS[backend](page_html) or []
+
+    for name in ("selectolax", "lxml", "bs4"):
+        if backend_available(name):
+            return BACKENDS[name](page_html)
+    return []
+
+
+YC_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+    "Cache-Control": "max-age=0",
+}
+
+_session = None
+_session_lock = threading.Lock()
+_host_slots = {}
+
+
+def get_session():
+    """One keep-alive session for every YC request in the process."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.headers.update(YC_HEADERS)
+                session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENCY_PER_HOST))
+                _session = session
+    return _session
+
+
+def _host_slot(url):
+    """Caps concurrent requests per host, however many threads are scraping."""
+    host = urlparse(url).netloc
+    with _session_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.Semaphore(MAX_CONCURRENCY_PER_HOST)
+        return _host_slots[host]
+
+
+def yc_jobs_url(role, location=None):
     url = f"https://www.ycombinator.com/jobs/role/{role}"
+    # YC location pages are /jobs/role/<role>/<location-slug>, e.g. "remote".
+    return f"{url}/{location}" if location else url
+
+
+def _parse_rows(page_html):
+    return [job.to_list() for job in parse_yc_jobs(page_html)]
+
+
+def scrape_yc_jobs(role="software-engineer", location=None):
+    """
+    Scrapes jobs from YCombinator based on role, optionally narrowed to a YC
+    location slug (e.g. "remote", "san-francisco-bay-area").
+    """
+    url = yc_jobs_url(role, location)
     print(f"Scraping YC jobs from {url}...")
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Connection": "keep-alive",
-        "Upgrade-Insecure-Requests": "1",
-        "Sec-Fetch-Dest": "document",
-        "Sec-Fetch-Mode": "navigate",
-        "Sec-Fetch-Site": "none",
-        "Sec-Fetch-User": "?1",
-        "Cache-Control": "max-age=0",
-    }
 
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Matches the 'li' container class observed
-        job_cards = soup.find_all('li', class_="my-2 flex h-auto w-full flex-col flex-nowrap rounded border border-[#ccc] bg-beige-lighter px-5 py-3")
-        
-        jobs = []
-        for card in job_cards:
-            try:
-                # Title and Link
-                title_elem = card.select_one('a.text-linkColor')
-                if not title_elem:
-                    continue
-                
-                title = title_elem.get_text(strip=True)
-                job_url = "https://www.ycombinator.com" + title_elem['href']
-                
-                # Company
-                # Company name is usually in a bold span
-                company_elem = card.select_one('span.font-bold')
-                company = company_elem.get_text(strip=True) if company_elem else "Unknown Company"
-                
-                # Details (Location, Salary)
-                # These are often in a flex container with bullets
-                details_container = card.select_one('.flex.flex-wrap.items-center.gap-x-1')
-                
-                salary = "N/A"
-                location_text = "Remote" # Default
-                
-                if details_container:
-                    # Salary often contains '$' or '₹' or '€' or '£'
-                    details_text = [div.get_text(strip=True) for div in details_container.find_all('div', recursive=False)]
-                    
-                    for item in details_text:
-                        if any(currency in item for currency in ['$', '₹', '€', '£', 'K']):
-                            salary = item
-                        elif item not in ['•', 'Full-time', 'Contract', 'Engineering', 'Product', 'Design']:
-                            # Heuristic for location: usually the longest remaining string or last item
-                            # But simple heuristic: it's likely the one that's not the others.
-                            # The last item is usually location in YC structure based on inspection
-                            location_text = item
-
-                # Parsing Salary for min/max if possible (simple split)
-                min_amount = 0
-                max_amount = 0
-                currency = "USD"
-                
-                # Job ID from URL
-                # e.g. /companies/peakflo/jobs/StcNZf7-data-analyst-remote-india -> StcNZf7
-                job_img_id = job_url.split('/jobs/')[-1]
-                
-                job_dict = {
-                    'id': f"yc-{job_img_id}", # Prefix to avoid collision
-                    'title': title,
-                    'company': company,
-                    'job_url': job_url,
-                    'location': location_text,
-                    'site': 'ycombinator',
-                    'min_amount': min_amount, # Placeholder, robust parsing is complex
-                    'max_amount': max_amount,
-                    'currency': currency,
-                    'salary_source': salary if salary != "N/A" else None,
-                    'date_posted': datetime.date.today().isoformat()
-                }
-                
-                jobs.append(job_dict)
-                
-            except Exception as e:
-                print(f"Error parsing job card: {e}")
-                continue
-                
+        # Conditional GET: an unchanged page comes back as a 304 (or the
+        # same bytes) and the previous parse is reused.
+        cache = shared_cache()
+        with _host_slot(url):
+            response = get_session().get(url, headers=cache.request_headers(url), timeout=30)
+        if response.status_code != 304:
+            response.raise_for_status()
+
+        # The cache stores parse results as JSON, so records go in as field lists.
+        rows = cache.resolve(url, response, _parse_rows, namespace=f"yc-records:{PARSER_BACKEND}") or []
+        jobs = [JobRecord(*row) for row in rows]
         print(f"Found {len(jobs)} YC jobs.")
         return jobs
 
@@ -106,6 +323,17 @@ def scrape_yc_jobs(role="software-engineer", location=None):
         print(f"Error fetching YC jobs: {e}")
         return []
 
+
+def merge_unique(seen_ids, jobs):
+    """Jobs whose ids are not in seen_ids yet; records them as seen."""
+    unique = []
+    for job in jobs:
+        if job.id not in seen_ids:
+            seen_ids.add(job.id)
+            unique.append(job)
+    return unique
+
+
 if __name__ == "__main__":
     # Test run
     results = scrape_yc_jobs()
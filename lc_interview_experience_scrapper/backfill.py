@@ -0,0 +1,151 @@
+"""
+Historical backfill of LeetCode interview posts through Bedrock batch
+inference instead of one synchronous converse call per post.
+
+1. submit: list posts, resolve their content, and queue one combined
+   classify-and-extract request per unvisited post into a batch job.
+2. ingest: once the job finishes, feed each result into the normal
+   classify -> extract -> persist -> notify stages (no further LLM calls).
+
+    python3 backfill.py submit --pages 40
+    python3 backfill.py ingest batch_jobs/<job_name> --wait
+
+--backend local runs the same flow offline: a stub model answers every
+post as an interview experience (utils.bedrock_batch.stub_extraction).
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.bedrock_batch import BatchJob, LocalStubBackend, S3BatchBackend
+from utils.database import setup_leetcode_tracking, is_leetcode_post_visited, sync_caches
+from utils.postgres_db import PostgresDB
+from utils.discord_service import get_sender
+from utils.discord_delivery import DeliveryQueue
+from main import PostProcessor, PAGE_SIZE, config
+from pipeline import Pipeline
+from lc_client import LeetCodeClient
+from bedrock_client import BedrockProcessor
+
+BATCH_CONFIG = config.get("bedrock", {}).get("batch", {})
+WORK_DIR = BATCH_CONFIG.get("work_dir", os.path.join(os.path.dirname(__file__), "batch_jobs"))
+
+
+def make_backend(name, bedrock):
+    if name == "local":
+        return LocalStubBackend()
+    return S3BatchBackend(
+        bedrock.bedrock_service,
+        bucket=BATCH_CONFIG["s3_bucket"],
+        prefix=BATCH_CONFIG.get("s3_prefix", "lc-backfill"),
+        role_arn=BATCH_CONFIG["role_arn"],
+        min_records=int(BATCH_CONFIG.get("min_records", 100))
+    )
+
+
+def submit(args):
+    setup_leetcode_tracking()
+    lc_client = LeetCodeClient()
+    bedrock = BedrockProcessor()
+    job = BatchJob(make_backend(args.backend, bedrock), WORK_DIR)
+
+    for page in range(args.pages):
+        data = lc_client.fetch_discussion_posts(limit=PAGE_SIZE, skip=page * PAGE_SIZE, order_by="MOST_RECENT")
+        if not data or "data" not in data:
+            print("Failed to fetch data or end of pages.")
+            break
+        listing = data["data"]["ugcArticleDiscussionArticles"]
+        sync_caches()
+        for edge in listing["edges"]:
+            node = edge["node"]
+            if node["uuid"] in job.metadata or is_leetcode_post_visited(node["uuid"]):
+                continue
+            post_url = f"https://leetcode.com/discuss/post/{node['topicId']}/"
+            content, _ = lc_client.resolve_post_content(node, post_url)
+            if not content:
+                continue
+            request = bedrock.build_combined_request(node["title"], content)
+            job.add(node["uuid"], metadata={"node": node, "content": content}, **request)
+        print(f"Page {page + 1}: {len(job.records)} posts queued so far.")
+        if not (listing.get("pageInfo") or {}).get("hasNextPage", True):
+            break
+
+    if not job.records:
+        print("Nothing to backfill.")
+        return
+    if len(job.records) < job.backend.min_records:
+        # Bedrock would reject the job after the upload; stop before either.
+        print(f"Only {len(job.records)} posts queued, but a Bedrock batch job needs at least "
+              f"{job.backend.min_records} records (bedrock.batch.min_records). Nothing submitted; "
+              f"try more --pages.")
+        return
+    job_id = job.submit()
+    print(f"Submitted {len(job.records)} records as {job.job_name} ({job_id}). Manifest: {job.job_dir}")
+
+
+def ingest(args):
+    setup_leetcode_tracking()
+    bedrock = BedrockProcessor()
+    job = BatchJob.load(make_backend(args.backend, bedrock), args.job_dir)
+    status = job.wait(poll_seconds=args.poll_seconds) if args.wait else job.backend.status(job.job_id)
+    if status not in ("Completed", "PartiallyCompleted"):
+        print(f"Job {job.job_name} is {status}; nothing to ingest yet.")
+        return
+
+    pg_db = PostgresDB()
+    outbox = DeliveryQueue(get_sender())
+    processor = PostProcessor(pg_db, None, bedrock, outbox)
+    # Content and extraction are already known, so skip the fetch stage.
+    pipeline = Pipeline(processor.build_stages()[1:]).start()
+    failed = 0
+    try:
+        for record_id, tool_input, metadata in job.results():
+            # Records without a classification (errors, truncated output)
+            # are left unvisited so the regular scraper can pick them up.
+            if not metadata or not tool_input or "is_interview_experience" not in tool_input:
+                failed += 1
+                continue
+            node = metadata["node"]
+            pipeline.submit({
+                "node": node,
+                "uuid": node["uuid"],
+                "title": node["title"],
+                "topic_id": node["topicId"],
+                "content": metadata["content"],
+                "extraction": tool_input,
+            })
+    finally:
+        pipeline.close()
+        outbox.flush()
+
+    print(f"\nBackfill ingest done. Processed: {processor.processed_count}, Failed records: {failed}")
+    for stage_stats in pipeline.report():
+        print(f"Stage stats: {stage_stats}")
+    print(f"Discord delivery: {outbox.summary()}")
+    outbox.close()
+    pg_db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["s3", "local"], default=BATCH_CONFIG.get("backend", "s3"))
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    submit_parser = sub.add_parser("submit")
+    submit_parser.add_argument("--pages", type=int, default=20)
+    submit_parser.set_defaults(func=submit)
+
+    ingest_parser = sub.add_parser("ingest")
+    ingest_parser.add_argument("job_dir")
+    ingest_parser.add_argument("--wait", action="store_true")
+    ingest_parser.add_argument("--poll-seconds", type=int, default=60)
+    ingest_parser.set_defaults(func=ingest)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,155 @@
-import json
+import copy
 import os
+import re
 import sys
+import threading
+import time
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 from utils.bedrock_service import BedrockService
+from utils.settings import get_settings
+from utils.llm_cache import LLMResultCache, DEFAULT_CACHE_PATH, make_cache_key
+from prompt_budget import PromptBudget, estimate_tokens
+
+# Shared by the two-step detail prompt and the combined single-call prompt.
+DETAIL_INSTRUCTIONS = (
+    "Please use the {tool_name} tool to generate the interview experience JSON based on the content within the <content> tags. "
+    "content tag contains json format content. All answers write as point of candidate experience and not as third person."
+    "In interview experience, please keep format intact like HTML tags and rich text, replace these with the markdown tags."
+    "Also when you are not able to get the value then put that field empty instead of having <UNKNOWN>."
+    "Also current interview experience is lacking information around level, if you are able to guess based on the interview experience and from the title."
+    "\n\nCONFIDENCE SCORE INSTRUCTIONS:\n"
+    "Analyze the quality of this interview experience and assign a 'confidence_score' (0-100).\n"
+    "- High Score (>80): Detailed description of rounds, clear questions asked, good structure.\n"
+    "- Medium Score (50-79): Some details, but missing specific questions or very brief.\n"
+    "- Low Score (<50): Extremely vague, one-liners, no meaningful details, or just 'I got rejected/accepted' without process details.\n"
+    "- ZERO ROUNDS: If the post does not describe any specific interview rounds/questions, score MUST be below 40.\n"
+    "Provide 'confidence_reasoning' explaining your score."
+)
+
+def _tokens(text):
+    return set(re.findall(r"[a-z0-9]+", (text or "").lower()))
+
+def match_job_role(job_roles, role_name):
+    """
+    Picks the job role whose name best overlaps role_name (Jaccard over
+    word tokens). Returns None when nothing shares a word with it.
+    """
+    wanted = _tokens(role_name)
+    if not wanted:
+        return None
+    best, best_score = None, 0.0
+    for role in job_roles:
+        have = _tokens(role['name'])
+        if not have:
+            continue
+        score = len(wanted & have) / len(wanted | have)
+        if score > best_score:
+            best, best_score = role, score
+    return best
+
+def top_job_roles(job_roles, title, summary, k):
+    """
+    The k job roles whose names best match the post: the share of a role's
+    words found in the title counts double the share found in the body.
+    Ties keep the original order; k <= 0 or a short list returns all roles.
+    """
+    if k <= 0 or len(job_roles) <= k:
+        return list(job_roles)
+    title_tokens = _tokens(title)
+    body_tokens = _tokens(summary)
+
+    def score(role):
+        have = _tokens(role['name'])
+        if not have:
+            return 0.0
+        return (2 * len(have & title_tokens) + len(have & body_tokens)) / len(have)
+
+    return sorted(job_roles, key=score, reverse=True)[:k]
+
+def format_job_roles(job_roles):
+    roles_text = "Internal Job Roles:\n"
+    for role in job_roles:
+        roles_text += f"- ID: {role['id']}, Name: {role['name']}\n"
+    return roles_text
 
 class BedrockProcessor:
     def __init__(self):
         self.bedrock_service = BedrockService()
 
+        # Extraction results are cached by a hash of everything that goes
+        # into the call, so posts retried in a later cycle cost nothing.
+        bedrock_config = get_settings().section("bedrock")
+        cache_config = bedrock_config.get("cache", {})
+        # "two_step": classify/company call, then a detail call with job roles.
+        # "combined": one call does both; job roles are matched by name after.
+        self.extraction_mode = bedrock_config.get("extraction_mode", "two_step")
+
+        self.cache = None
+        if cache_config.get("enabled", True):
+            self.cache = LLMResultCache(
+                path=cache_config.get("path", DEFAULT_CACHE_PATH),
+                ttl_seconds=float(cache_config.get("ttl_hours", 24 * 30)) * 3600,
+                max_entries=int(cache_config.get("max_entries", 20000))
+            )
+
+        # Post text is trimmed to a per-call token budget before prompting;
+        # the company call only needs the opening of a post.
+        prompt_config = bedrock_config.get("prompt", {})
+        self.prompt_budget = PromptBudget(
+            budgets={
+                "company": int(prompt_config.get("company_tokens", 800)),
+                "detail": int(prompt_config.get("detail_tokens", 6000)),
+                "combined": int(prompt_config.get("combined_tokens", 6000)),
+            },
+            max_job_roles=int(prompt_config.get("max_job_roles", 15)),
+            enabled=prompt_config.get("enabled", True)
+        )
+
+        self.call_stats = {"calls": 0, "cached": 0, "latency": 0.0, "input_tokens": 0, "output_tokens": 0}
+        self._stats_lock = threading.Lock()
+
+    def _tool_call(self, messages, inference_config, tool_config):
+        """
+        Runs a forced tool-use converse call and returns the tool input,
+        consulting the result cache first. Failed calls (None) are not cached.
+        """
+        key = None
+        if self.cache:
+            key = make_cache_key(self.bedrock_service.model_id, tool_config, inference_config, messages)
+            cached = self.cache.get(key)
+            if cached is not None:
+                with self._stats_lock:
+                    self.call_stats["cached"] += 1
+                return cached
+
+        start = time.monotonic()
+        response = self.bedrock_service.converse(
+            messages=messages,
+            inference_config=inference_config,
+            tool_config=tool_config
+        )
+        latency = time.monotonic() - start
+        result = self.bedrock_service.extract_tool_result(response)
+
+        usage = response.get("usage") or {}
+        with self._stats_lock:
+            self.call_stats["calls"] += 1
+            self.call_stats["latency"] += latency
+            self.call_stats["input_tokens"] += usage.get("inputTokens", 0)
+            self.call_stats["output_tokens"] += usage.get("outputTokens", 0)
+
+        if self.cache and result is not None:
+            self.cache.put(key, result, latency=latency, usage=response.get("usage"))
+        return result
+
+    def cache_stats(self):
+        return self.cache.summary() if self.cache else None
+
+    def prompt_stats(self):
+        return self.prompt_budget.summary()
+
     def _get_company_tools(self):
         return [
             {
@@ -136,7 +276,36 @@ class BedrockProcessor:
         }
     ]
 
+    def _get_combined_tools(self):
+        # The detail schema plus the classification fields. The model names
+        # the role in free text; we do not know the company's role IDs yet.
+        tool = copy.deepcopy(self._get_interview_tools()[0])
+        spec = tool["toolSpec"]
+        spec["name"] = "interview_classify_and_extract"
+        spec["description"] = "Classify the post and, if it is an interview experience, extract the company and interview details."
+        schema = spec["inputSchema"]["json"]
+        properties = schema["properties"]
+        del properties["job_role_id"]
+        schema["properties"] = {
+            "is_interview_experience": {
+                "type": "boolean",
+                "description": "True if this is an interview experience, False if general discussion."
+            },
+            "company_name": {
+                "type": "string",
+                "description": "Name of the company."
+            },
+            "job_role_name": {
+                "type": "string",
+                "description": "Job role / title the candidate interviewed for, e.g. 'Software Engineer II'."
+            },
+            **properties
+        }
+        schema["required"] = ["is_interview_experience"]
+        return [tool]
+
     def extract_company_info(self, title, summary):
+        summary = self.prompt_budget.trim("company", summary)
         content_text = f"Title: {title}\nSummary: {summary}"
         prompt = """
         Determine if this is an interview experience. 
@@ -147,7 +316,7 @@ class BedrockProcessor:
         """
         
         try:
-            response = self.bedrock_service.converse(
+            return self._tool_call(
                 messages=[{"role": "user", "content": [{"text": content_text}, {"text": prompt}]}],
                 inference_config={"maxTokens": 1024, "temperature": 0},
                 tool_config={
@@ -155,42 +324,36 @@ class BedrockProcessor:
                     "toolChoice": {"tool": {"name": "company_extraction"}}
                 }
             )
-
-            return self.bedrock_service.extract_tool_result(response)
         except Exception as e:
             print(f"Bedrock Company Extraction Error: {e}")
             return None
 
     def extract_interview_details(self, title, summary, job_roles_context):
+        summary = self.prompt_budget.trim("detail", summary)
         content_text = f"Title: {title}\nSummary: {summary}"
         
-        # Format job roles for context
-        roles_text = "Internal Job Roles:\n"
-        for role in job_roles_context:
-            roles_text += f"- ID: {role['id']}, Name: {role['name']}\n"
+        # Only the closest job roles go into the prompt
+        roles_text = format_job_roles(job_roles_context)
+        if self.prompt_budget.enabled:
+            candidates = top_job_roles(job_roles_context, title, summary, self.prompt_budget.max_job_roles)
+            pruned_text = format_job_roles(candidates)
+            self.prompt_budget.record_roles(
+                "detail", len(job_roles_context), len(candidates),
+                estimate_tokens(roles_text), estimate_tokens(pruned_text)
+            )
+            roles_text = pruned_text
             
         prompt = (
             f"Here are the existing Job Roles for this company:\n{roles_text}\n"
             "Analyze the interview experience. Match it to the MOST appropriate Internal Job Role ID from the list above. "
             "If no perfect match exists, pick the closest one (e.g. Software Engineer) or generic. " 
             "Then extract the rest of the interview details."
-            "Please use the interview_experience_extraction tool to generate the interview experience JSON based on the content within the <content> tags. "
-            "content tag contains json format content. All answers write as point of candidate experience and not as third person."
-            "In interview experience, please keep format intact like HTML tags and rich text, replace these with the markdown tags."
-            "Also when you are not able to get the value then put that field empty instead of having <UNKNOWN>."
-            "Also current interview experience is lacking information around level, if you are able to guess based on the interview experience and from the title."
-            "\n\nCONFIDENCE SCORE INSTRUCTIONS:\n"
-            "Analyze the quality of this interview experience and assign a 'confidence_score' (0-100).\n"
-            "- High Score (>80): Detailed description of rounds, clear questions asked, good structure.\n"
-            "- Medium Score (50-79): Some details, but missing specific questions or very brief.\n"
-            "- Low Score (<50): Extremely vague, one-liners, no meaningful details, or just 'I got rejected/accepted' without process details.\n"
-            "- ZERO ROUNDS: If the post does not describe any specific interview rounds/questions, score MUST be below 40.\n"
-            "Provide 'confidence_reasoning' explaining your score."
+            + DETAIL_INSTRUCTIONS.format(tool_name="interview_experience_extraction")
             )
         
 
         try:
-            response = self.bedrock_service.converse(
+            return self._tool_call(
                 messages=[{"role": "user", "content": [{"text": content_text}, {"text": prompt}]}],
                 inference_config={"maxTokens": 4096, "temperature": 0},
                 tool_config={
@@ -198,8 +361,38 @@ class BedrockProcessor:
                     "toolChoice": {"tool": {"name": "interview_experience_extraction"}}
                 }
             )
-
-            return self.bedrock_service.extract_tool_result(response)
         except Exception as e:
             print(f"Bedrock Detail Extraction Error: {e}")
             return None
+
+    def build_combined_request(self, title, summary):
+        """Converse arguments for the combined call; also used to queue batch-inference records."""
+        summary = self.prompt_budget.trim("combined", summary)
+        content_text = f"Title: {title}\nSummary: {summary}"
+        prompt = (
+            "First determine if this is an interview experience: a post where a candidate shares their own interview "
+            "at a company, usually with the company name in the title, rounds, duration and job role. "
+            "If it is not, set is_interview_experience to false and leave every other field empty. "
+            "If it is, extract the Company Name, the job role the candidate interviewed for (job_role_name), "
+            "and the rest of the interview details. "
+            + DETAIL_INSTRUCTIONS.format(tool_name="interview_classify_and_extract")
+        )
+        return {
+            "messages": [{"role": "user", "content": [{"text": content_text}, {"text": prompt}]}],
+            "inference_config": {"maxTokens": 4096, "temperature": 0},
+            "tool_config": {
+                "tools": self._get_combined_tools(),
+                "toolChoice": {"tool": {"name": "interview_classify_and_extract"}}
+            }
+        }
+
+    def extract_combined(self, title, summary):
+        """
+        Single-call alternative to extract_company_info + extract_interview_details.
+        Returns the tool input (with job_role_name instead of job_role_id) or None.
+        """
+        try:
+            return self._tool_call(**self.build_combined_request(title, summary))
+        except Exception as e:
+            print(f"Bedrock Combined Extraction Error: {e}")
+            return None
@@ -1,12 +1,52 @@
-import tls_client
+import asyncio
 import json
-import time
-from bs4 import BeautifulSoup
+import os
+import random
+import sys
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from utils.rate_limiter import TokenBucket
+from utils.http_cache import shared_cache
+from utils.settings import get_settings
+
+# Outcomes of a single post page request.
+DONE = "done"
+RETRY = "retry"
+NEXT_PROFILE = "next_profile"
 
 class LeetCodeClient:
     URL = "https://leetcode.com/graphql/"
+    # Browser profiles to try in order when a page returns 403
+    PROFILES = ["chrome_120", "firefox_120", "safari_16_0", "opera_90"]
     
     def __init__(self):
+        lc_config = get_settings().section("leetcode")
+
+        # Defaults match the old fixed 2s politeness delay.
+        self.limiter = TokenBucket(
+            rate=lc_config.get("requests_per_second", 0.5),
+            burst=lc_config.get("burst", 1)
+        )
+        self.max_retries = int(lc_config.get("max_retries", 3))
+        self.backoff_base = float(lc_config.get("backoff_base_seconds", 2))
+        self.max_concurrency = int(lc_config.get("max_concurrency", 4))
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+        # GraphQL content shorter than this is treated as a teaser and the
+        # full page is scraped instead.
+        self.min_graphql_content_chars = int(lc_config.get("min_graphql_content_chars", 200))
+        self.content_stats = {"graphql": 0, "html": 0, "failed": 0}
+        # Post pages are cached on disk; a post retried within this window
+        # is served from the cache without a request.
+        self.http_cache = shared_cache()
+        self.post_cache_seconds = float(lc_config.get("post_cache_hours", 24)) * 3600
+        self._stats_lock = threading.Lock()
+
+        # tls_client loads a native library; imported here so importing this
+        # module (and the scraper's startup) doesn't pay for it.
+        import tls_client
+
         # Use Chrome 120 identifier to mimic a real browser and bypass Cloudflare
         self.session = tls_client.Session(
             client_identifier="chrome_120",
@@ -17,7 +57,7 @@ class LeetCodeClient:
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         })
 
-    def fetch_discussion_posts(self, limit=50, skip=0):
+    def fetch_discussion_posts(self, limit=50, skip=0, rate_limit=True, order_by="HOT"):
         query = """
         query discussPostItems($orderBy: ArticleOrderByEnum, $keywords: [String]!, $tagSlugs: [String!], $skip: Int, $first: Int) {
             ugcArticleDiscussionArticles(
@@ -55,7 +95,7 @@ class LeetCodeClient:
         """
         
         variables = {
-            "orderBy": "HOT",
+            "orderBy": order_by,
             "keywords": [""],
             "tagSlugs": ["interview"],
             "skip": skip,
@@ -75,6 +115,8 @@ class LeetCodeClient:
                 "User-Agent": self.session.headers["User-Agent"]
             }
             
+            if rate_limit:
+                self.limiter.acquire()
             response = self.session.post(self.URL, json=payload, headers=headers)
             
             if response.status_code != 200:
@@ -90,49 +132,180 @@ class LeetCodeClient:
             print(f"Error fetching LeetCode posts: {e}")
             return None
 
-    def fetch_post_content(self, url):
-        # List of profiles to try in case of 403
-        profiles = ["chrome_120", "firefox_120", "safari_16_0", "opera_90"]
-        
-        for profile in profiles:
-            try:
-                time.sleep(2) # Politeness delay
-                
-                # Create a temporary session for this request to try specific profile
-                temp_session = tls_client.Session(
+    def _profile_session(self, profile):
+        # One long-lived session per browser profile so cookies and TLS
+        # connections are reused across posts instead of rebuilt per attempt.
+        with self._sessions_lock:
+            session = self._sessions.get(profile)
+            if session is None:
+                import tls_client
+
+                session = tls_client.Session(
                     client_identifier=profile,
                     random_tls_extension_order=True
                 )
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                    "Accept-Language": "en-US,en;q=0.9",
-                    "Referer": "https://leetcode.com/discuss/interview-experience?currentPage=1&orderBy=hot&query=",
-                }
-                
-                if "safari" in profile:
-                     headers["User-Agent"] = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.1 Safari/605.1.15"
+                self._sessions[profile] = session
+            return session
 
-                response = temp_session.get(url, headers=headers)
-                
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    content_div = soup.find('div', class_="relative mt-4 flex w-full flex-none flex-col overflow-auto px-4 pb-8 gap-4")
-                    
-                    if content_div:
-                        return content_div.get_text(separator="\n", strip=True)
-                    else:
-                        print(f"Warning: Content div not found for {url}")
-                        return ""
-                elif response.status_code == 403:
-                    print(f"  - 403 Forbidden with {profile}. Retrying with next profile...")
-                    continue
-                else:
-                    print(f"Error scraping post content from {url}: Status {response.status_code}")
-                    return ""
-
-            except Exception as e:
-                print(f"Error scraping post content from {url} with {profile}: {e}")
-                continue
+    def _post_headers(self, profile):
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            "Accept-Language": "en-US,en;q=0.9",
+            "Referer": "https://leetcode.com/discuss/interview-experience?currentPage=1&orderBy=hot&query=",
+        }
+        if "safari" in profile:
+             headers["User-Agent"] = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.1 Safari/605.1.15"
+        return headers
+
+    def _backoff_delay(self, response, attempt):
+        """Seconds to hold off after a 403/429: Retry-After if given, else exponential with jitter."""
+        retry_after = response.headers.get("Retry-After") if response.headers else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.backoff_base * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def _parse_post_html(self, html, url):
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, 'html.parser')
+        content_div = soup.find('div', class_="relative mt-4 flex w-full flex-none flex-col overflow-auto px-4 pb-8 gap-4")
+
+        if content_div:
+            return content_div.get_text(separator="\n", strip=True)
+        print(f"Warning: Content div not found for {url}")
+        return ""
+
+    def _handle_post_response(self, response, url, profile, attempt):
+        """Maps a post page response to (DONE | RETRY | NEXT_PROFILE, content)."""
+        if response.status_code in (200, 304):
+            content = self.http_cache.resolve(
+                url, response, lambda html: self._parse_post_html(html, url), namespace="lc-post"
+            )
+            return DONE, content or ""
+        if response.status_code == 429:
+            delay = self._backoff_delay(response, attempt)
+            print(f"  - 429 Too Many Requests with {profile}. Backing off {delay:.1f}s...")
+            self.limiter.pause(delay)
+            return RETRY, None
+        if response.status_code == 403:
+            print(f"  - 403 Forbidden with {profile}. Retrying with next profile...")
+            self.limiter.pause(self._backoff_delay(response, attempt))
+            return NEXT_PROFILE, None
+        print(f"Error scraping post content from {url}: Status {response.status_code}")
+        return DONE, ""
+
+    def _post_request_headers(self, url, profile):
+        return self.http_cache.request_headers(url, self._post_headers(profile))
+
+    def _get_post(self, url, profile):
+        return self._profile_session(profile).get(url, headers=self._post_request_headers(url, profile))
+
+    def fetch_post_content(self, url):
+        cached = self.http_cache.get_fresh(url, self.post_cache_seconds, namespace="lc-post")
+        if cached:
+            return cached
+
+        # Try each profile in turn; 429s retry the same profile after
+        # backing off, 403s move on to the next profile.
+        for profile in self.PROFILES:
+            for attempt in range(self.max_retries):
+                try:
+                    self.limiter.acquire()
+                    response = self._get_post(url, profile)
+                except Exception as e:
+                    print(f"Error scraping post content from {url} with {profile}: {e}")
+                    break
+
+                outcome, content = self._handle_post_response(response, url, profile, attempt)
+                if outcome == DONE:
+                    return content
+                if outcome == NEXT_PROFILE:
+                    break
         
         print(f"Failed to scrape {url} after trying all profiles.")
         return ""
+
+
+    def _graphql_content_usable(self, node):
+        content = (node.get("content") or "").strip()
+        if len(content) < self.min_graphql_content_chars:
+            return False
+        # A body that is just the listing summary, or ends in an ellipsis,
+        # was cut short by the API.
+        summary = (node.get("summary") or "").strip()
+        if summary and content == summary:
+            return False
+        if content.endswith("...") or content.endswith("\u2026"):
+            return False
+        return True
+
+    def _count_content_source(self, source):
+        with self._stats_lock:
+            self.content_stats[source] += 1
+
+    def resolve_post_content(self, node, post_url):
+        """
+        Returns (content, source) for a discussion node. Uses the content the
+        GraphQL listing already returned when it looks complete, and only
+        falls back to scraping the post page when it is missing or
+        truncated. source is "graphql", "html" or "failed".
+        """
+        if self._graphql_content_usable(node):
+            self._count_content_source("graphql")
+            return node["content"].strip(), "graphql"
+
+        content = self.fetch_post_content(post_url)
+        source = "html" if content else "failed"
+        self._count_content_source(source)
+        return content, source
+
+
+class AsyncLeetCodeClient:
+    """
+    asyncio front-end over LeetCodeClient. Shares its per-profile sessions
+    and token bucket, so many page fetches can be in flight at once while
+    the overall request rate stays within the configured budget.
+
+    tls_client is a blocking library, so each request, and the cache and
+    HTML parsing work around it, runs in a worker thread; the rate
+    limiting and backoff waits are non-blocking.
+    """
+
+    def __init__(self, client=None, max_concurrency=None):
+        self.client = client or LeetCodeClient()
+        self.semaphore = asyncio.Semaphore(max_concurrency or self.client.max_concurrency)
+
+    async def fetch_discussion_posts(self, limit=50, skip=0, order_by="HOT"):
+        await self.client.limiter.acquire_async()
+        return await asyncio.to_thread(self.client.fetch_discussion_posts, limit, skip, False, order_by)
+
+    async def fetch_post_content(self, url):
+        client = self.client
+        cached = await asyncio.to_thread(client.http_cache.get_fresh, url, client.post_cache_seconds, namespace="lc-post")
+        if cached:
+            return cached
+        async with self.semaphore:
+            for profile in client.PROFILES:
+                for attempt in range(client.max_retries):
+                    await client.limiter.acquire_async()
+                    try:
+                        response = await asyncio.to_thread(client._get_post, url, profile)
+                    except Exception as e:
+                        print(f"Error scraping post content from {url} with {profile}: {e}")
+                        break
+
+                    outcome, content = await asyncio.to_thread(client._handle_post_response, response, url, profile, attempt)
+                    if outcome == DONE:
+                        return content
+                    if outcome == NEXT_PROFILE:
+                        break
+
+        print(f"Failed to scrape {url} after trying all profiles.")
+        return ""
+
+    async def fetch_many(self, urls):
+        """Fetches several post pages concurrently. Returns contents in input order."""
+        return await asyncio.gather(*(self.fetch_post_content(url) for url in urls))
@@ -1,330 +1,543 @@
 import sys
 import os
 import time
-import json
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta, timezone
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
-from utils.database import setup_leetcode_tracking, is_leetcode_post_visited, mark_leetcode_post_visited
+from utils.database import (
+    setup_leetcode_tracking, is_leetcode_post_visited, mark_leetcode_post_visited, sync_caches, cache_stats,
+    get_crawl_state, set_crawl_state,
+)
 from utils.postgres_db import PostgresDB
 from lc_client import LeetCodeClient
-from bedrock_client import BedrockProcessor
-from utils.discord_service import DiscordSender
+from bedrock_client import BedrockProcessor, match_job_role
+from pipeline import Pipeline, Stage
+from preclassifier import PreClassifier
+from utils.discord_service import get_sender
+from utils.discord_delivery import DeliveryQueue
+from utils.settings import get_settings
 
 # --- CONFIGURATION ---
-try:
-    config_path = os.path.join(os.path.dirname(__file__), '..', 'utils', 'config.json')
-    with open(config_path, "r") as f:
-        config = json.load(f)
-except FileNotFoundError:
+config = get_settings()
+if not config.found:
     print("Error: config.json not found.")
     exit(1)
 
 SCRAPE_INTERVAL_HOURS = config.get("lc_scrape_interval_hours", 6)
 
+# Worker threads per stage. Fetch and the two Bedrock stages are network
+# bound and benefit most; Discord stays at 1 to keep message order/rate sane.
+PIPELINE_CONFIG = {
+    "fetch_workers": 4,
+    "classify_workers": 4,
+    "extract_workers": 4,
+    "persist_workers": 2,
+    "notify_workers": 1,
+    "queue_size": 10,
+    **config.get("lc_pipeline", {}),
+}
+
+LC_CONFIG = config.get("leetcode", {})
+# "incremental": newest first, stop at the stored high-water mark.
+# "hot": the original fixed crawl of the HOT listing.
+CRAWL_MODE = LC_CONFIG.get("crawl_mode", "incremental")
+MAX_PAGES = int(LC_CONFIG.get("max_pages", 5))
+PAGE_SIZE = 50
+HIGH_WATER_MARK_KEY = "leetcode_interview_high_water_mark"
+PRECLASSIFIER_CONFIG = LC_CONFIG.get("preclassifier", {})
+
+VALID_DIFFICULTIES = ["EASY", "MEDIUM", "HARD"]
+
+
+def parse_creation_date(value):
+    """Parses a GraphQL creationDate (ISO string or epoch seconds) into an aware datetime."""
+    if value is None:
+        return None
+    try:
+        if isinstance(value, (int, float)) or str(value).isdigit():
+            return datetime.fromtimestamp(float(value), tz=timezone.utc)
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    except (ValueError, OverflowError):
+        return None
+
+
+def next_high_water_mark(newest_seen, queued_dates):
+    """
+    The mark to store after a run: the newest post listed, unless some
+    queued post did not finish (it is left unvisited for retry), in which
+    case the mark stays just below the oldest such post so the next
+    incremental crawl reaches it again.
+    """
+    unfinished = [created for uuid, created in queued_dates.items()
+                  if created is not None and not is_leetcode_post_visited(uuid)]
+    if unfinished:
+        return min(unfinished) - timedelta(microseconds=1)
+    return newest_seen
+
+
+class PostProcessor:
+    """
+    The per-post work of a scrape run, split into pipeline stages:
+    fetch -> classify -> extract -> persist -> notify.
+
+    Each stage takes the post context dict, adds its results and returns
+    it, or returns None once the post has been fully handled (skipped,
+    marked visited, or failed and left for the next cycle to retry).
+    """
+
+    def __init__(self, pg_db, lc_client, bedrock, outbox, preclassifier=None):
+        self.pg_db = pg_db
+        self.lc_client = lc_client
+        self.bedrock = bedrock
+        self.outbox = outbox
+        self.preclassifier = preclassifier
+        self.processed_count = 0
+        self._count_lock = threading.Lock()
+
+    def log(self, ctx, message):
+        # Stages run concurrently, so tag each line with the post it is about.
+        print(f"  [{ctx['uuid'][:8]}] {message}")
+
+    def build_stages(self):
+        return [
+            Stage("fetch", self.fetch, PIPELINE_CONFIG["fetch_workers"], PIPELINE_CONFIG["queue_size"]),
+            Stage("classify", self.classify, PIPELINE_CONFIG["classify_workers"], PIPELINE_CONFIG["queue_size"]),
+            Stage("extract", self.extract, PIPELINE_CONFIG["extract_workers"], PIPELINE_CONFIG["queue_size"]),
+            Stage("persist", self.persist, PIPELINE_CONFIG["persist_workers"], PIPELINE_CONFIG["queue_size"]),
+            Stage("notify", self.notify, PIPELINE_CONFIG["notify_workers"], PIPELINE_CONFIG["queue_size"]),
+        ]
+
+    def fetch(self, ctx):
+        # Full Content: from the GraphQL node when complete, else scrape the page
+        post_url = f"https://leetcode.com/discuss/post/{ctx['topic_id']}/"
+        full_content, source = self.lc_client.resolve_post_content(ctx["node"], post_url)
+
+        if not full_content:
+            self.log(ctx, f"Failed to scrape content from {post_url}. SKIPPING.")
+            return None
+
+        ctx["content"] = full_content
+        self.log(ctx, f"Full content from {source} url : {post_url} ({len(full_content)} chars)")
+        return ctx
+
+    def classify(self, ctx):
+        # Step 1: Check Interview & Extract Company
+        decision = None
+        if ctx.get("extraction") is None and self.preclassifier:
+            # Obvious general discussion never reaches Bedrock.
+            decision = self.preclassifier.decide(ctx["title"], ctx["content"])
+            if decision == "reject":
+                self.log(ctx, "Not an interview experience (local pre-filter).")
+                mark_leetcode_post_visited(ctx["uuid"])
+                return None
+
+        if ctx.get("extraction") is not None:
+            # Already extracted by a combined call elsewhere (batch backfill).
+            company_info = ctx["extraction"]
+        elif self.bedrock.extraction_mode == "combined":
+            # One call classifies and extracts everything; extract() reuses it.
+            company_info = self.bedrock.extract_combined(ctx["title"], ctx["content"])
+            ctx["extraction"] = company_info
+        else:
+            company_info = self.bedrock.extract_company_info(ctx["title"], ctx["content"])
+
+        if company_info and self.preclassifier:
+            self.preclassifier.record_label(
+                ctx["uuid"], ctx["title"], ctx["content"],
+                company_info.get("is_interview_experience"), audited=decision == "audit"
+            )
+
+        if not company_info or not company_info.get("is_interview_experience"):
+            self.log(ctx, "Not an interview experience (or failed extraction).")
+            mark_leetcode_post_visited(ctx["uuid"])
+            return None
+
+        company_name = company_info.get("company_name")
+        if not company_name:
+            self.log(ctx, "Interview experience, but no company name found.")
+            mark_leetcode_post_visited(ctx["uuid"])
+            return None
+
+        # Step 2: Get/Create Company in DB
+        company_slug = company_name.lower().replace(" ", "-")
+        company = self.pg_db.get_or_create_company(company_name, company_slug)
+        self.log(ctx, f"Company: {company['name']} ({company['id']})")
+
+        # Step 3: Fetch Internal Job Roles
+        ctx["company"] = company
+        ctx["job_roles"] = self.pg_db.get_job_roles_for_company(company['id'])
+
+        if ctx.get("extraction"):
+            # Combined mode: resolve the free-text role name against this
+            # company's roles; no match falls through to the usual fallbacks.
+            matched = match_job_role(ctx["job_roles"], ctx["extraction"].get("job_role_name"))
+            ctx["extraction"]["job_role_id"] = matched['id'] if matched else None
+        return ctx
+
+    def extract(self, ctx):
+        job_roles = ctx["job_roles"]
+
+        # Step 4: Extract Interview Details with Context (already done in combined mode)
+        extraction = ctx.get("extraction") or self.bedrock.extract_interview_details(ctx["title"], ctx["content"], job_roles)
+        if not extraction:
+            self.log(ctx, "Failed to extract detailed interview info.")
+            # If step 1 passed but step 4 failed, it's an error.
+            # Let's NOT mark visited so we can retry if it's transient.
+            return None
+
+        # --- CONFIDENCE CHECK ---
+        confidence_score = extraction.get("confidence_score", 0)
+        confidence_reasoning = extraction.get("confidence_reasoning", "No reasoning provided.")
+        interview_rounds = extraction.get("interview_rounds", [])
+
+        self.log(ctx, f"Extraction Score: {confidence_score}/100. Reasoning: {confidence_reasoning}")
+
+        if confidence_score < 70:
+            self.log(ctx, f"SKIPPING: Low Confidence Score ({confidence_score}%).")
+            mark_leetcode_post_visited(ctx["uuid"])
+            return None
+
+        if not interview_rounds:
+            self.log(ctx, "SKIPPING: No interview rounds found.")
+            mark_leetcode_post_visited(ctx["uuid"])
+            return None
+        # ------------------------
+
+        # Resolve Job Role ID
+        job_role_id = extraction.get("job_role_id")
+
+        # Validation: Check if returned ID is valid for this company
+        valid_ids = [r['id'] for r in job_roles]
+        if job_role_id not in valid_ids:
+            self.log(ctx, f"Bedrock returned invalid/unknown Job Role ID: {job_role_id}. Falling back.")
+            # Fallback strategies:
+            # 1. Try to find "Software Engineer" in the list
+            # 2. Pick the first one
+            # 3. Use the global "Software Engineer" role
+
+            fallback_role = next((r for r in job_roles if "software engineer" in r['name'].lower()), None)
+            if fallback_role:
+                job_role_id = fallback_role['id']
+                self.log(ctx, f"Fallback to: {fallback_role['name']}")
+            elif job_roles:
+                job_role_id = job_roles[0]['id'] # Desperate fallback
+                self.log(ctx, f"Desperate fallback to first role: {job_roles[0]['name']}")
+            else:
+                # No roles at all for this company, search global
+                global_role = self.pg_db.get_job_role_by_name("Software Engineer")
+                if global_role:
+                    job_role_id = global_role['id']
+                    self.log(ctx, "Fallback to GLOBAL Software Engineer role.")
+                else:
+                    self.log(ctx, "CRITICAL: No Job Role found. Skipping.")
+                    mark_leetcode_post_visited(ctx["uuid"])
+                    return None
+
+        ctx["extraction"] = extraction
+        ctx["job_role_id"] = job_role_id
+        return ctx
+
+    def persist(self, ctx):
+        extraction = ctx["extraction"]
+        node = ctx["node"]
+
+        try:
+            # Create Interview
+            try:
+                num_rounds = int(extraction.get("number_of_rounds", 0))
+            except (ValueError, TypeError):
+                num_rounds = 0
+
+            try:
+                rating = float(extraction.get("overall_rating", 0))
+            except (ValueError, TypeError):
+                rating = 0.0
+
+            interview_data = {
+                "companyId": ctx["company"]['id'],
+                "userId": "1",
+                "jobRoleId": ctx["job_role_id"],
+                "slug": node['slug'],
+                "title": ctx["title"],
+                "location": extraction.get("location"),
+                "date": datetime.now(),
+                "difficulty": extraction.get("interview_difficulty", "Medium").upper(),
+                "noOfRounds": num_rounds,
+                "interviewProcess": extraction.get("company_interview_process"),
+                "preparationSources": extraction.get("preparation_source"),
+                "overallRating": rating,
+                "isAnonymous": extraction.get("is_anonymous", False),
+                "status": "PUBLISHED",
+                "offerStatus": extraction.get("offer_status", "PENDING").upper()
+            }
+
+            # ENUM validations
+            if interview_data["difficulty"] not in VALID_DIFFICULTIES:
+                 interview_data["difficulty"] = "MEDIUM"
+
+            # Mapping
+            status_map = {
+                "Offer": "OFFERED",
+                "Pending": "PENDING",
+                "Rejected": "REJECTED",
+                "Accepted": "OFFERED",
+                "Declined": "REJECTED"
+            }
+            mapped_status = status_map.get(extraction.get("offer_status"), "PENDING")
+
+            valid_offer_status = ["OFFERED", "PENDING", "REJECTED"]
+            if mapped_status not in valid_offer_status: mapped_status = "PENDING"
+
+            interview_data["offerStatus"] = mapped_status
+
+            # Rounds
+            rounds_db_data = []
+            for round_data in extraction.get("interview_rounds", []):
+                r_diff = round_data.get("difficulty", "Medium").upper()
+                if r_diff not in VALID_DIFFICULTIES: r_diff = "MEDIUM"
+
+                start_index = 1
+                try:
+                    start_index = int(round_data.get("sequence", 1))
+                except:
+                    pass
+
+                rounds_db_data.append({
+                    "name": round_data.get("name", f"Round {start_index}"),
+                    "duration": round_data.get("duration"),
+                    "difficulty": r_diff,
+                    "experience": round_data.get("experience", ""),
+                    "keyTakeaways": round_data.get("key_takeaways"),
+                    "orderIndex": start_index
+                })
+
+            # Interview and rounds are written in one transaction, so a
+            # failed round never leaves a half-written interview behind.
+            interview_id = self.pg_db.save_interview_with_rounds(interview_data, rounds_db_data)
+            self.log(ctx, f"Created Interview: {interview_id} with {len(rounds_db_data)} rounds")
+        except Exception as e:
+            self.log(ctx, f"Error saving to DB: {e}")
+            return None
+
+        ctx["interview_id"] = interview_id
+        ctx["interview_data"] = interview_data
+        ctx["num_rounds"] = num_rounds
+        return ctx
+
+    def notify(self, ctx):
+        extraction = ctx["extraction"]
+        interview_data = ctx["interview_data"]
+        company = ctx["company"]
+        job_roles = ctx["job_roles"]
+
+        # Send Discord Notification
+        try:
+            # Resolve Job Role Name and Profile Name
+            role_name = "Software Engineer"
+            profile_name = "Software Engineering" # Default fallback
+            if job_roles:
+                 matched_role = next((r for r in job_roles if r['id'] == ctx["job_role_id"]), None)
+                 if matched_role:
+                     role_name = matched_role['name']
+                     profile_name = matched_role.get('profile_name', 'Software Engineering')
+
+            # Status Colors
+            color_map = {
+                "OFFERED": 0x43B581, # Green
+                "PENDING": 0xFFAA00, # Orange
+                "REJECTED": 0xF04747  # Red
+            }
+            embed_color = color_map.get(interview_data['offerStatus'], 0x3498DB) # Default Blue
+
+            # Build Description from Rounds
+            description = ""
+            for i, r_data in enumerate(extraction.get("interview_rounds", [])):
+                r_name = r_data.get("name", f"Round {i+1}")
+                r_exp = r_data.get("experience", "")
+                # Truncate experience for preview
+                preview = (r_exp[:150] + '...') if len(r_exp) > 150 else r_exp
+                # Add emoji based on name keywords
+                emoji = "🔘"
+                if "coding" in r_name.lower() or "dsa" in r_name.lower(): emoji = "💻"
+                elif "system" in r_name.lower() and "design" in r_name.lower(): emoji = "🏗️"
+                elif "behavioral" in r_name.lower() or "manager" in r_name.lower(): emoji = "💬"
+
+                description += f"{emoji} **{r_name}**\n{preview}\n\n"
+
+            # Quality Check: Skip if description is empty or contains <UNKNOWN>
+            if not description.strip() or "<UNKNOWN>" in description:
+                self.log(ctx, "Discord notification skipped (Low quality/Unknown content).")
+            else:
+                # Construct Embed
+                link = f"https://roundz.ai/interviews/{ctx['interview_id']}/{interview_data['slug']}"
+
+                # Formatted Title: Company | Job Profile | Job Role | Location (if present) | Offer Status
+                loc_raw = interview_data.get('location')
+                loc_str = str(loc_raw).strip() if loc_raw else ""
+                invalid_locs = ["", "none", "unknown", "null", "<unknown>"]
+                is_valid_loc = loc_str and loc_str.lower() not in invalid_locs
+                loc_part = f" | {loc_str}" if is_valid_loc else ""
+                formatted_title = f"{company['name']} | {profile_name} | {role_name}{loc_part} | {interview_data['offerStatus']}"
+
+                embed = {
+                    "title": formatted_title,
+                    "url": link,
+                    "color": embed_color,
+                    "fields": [
+                        {"name": "Company", "value": company['name'], "inline": True},
+                        {"name": "Role", "value": role_name, "inline": True},
+                        {"name": "Difficulty", "value": interview_data['difficulty'], "inline": True},
+                        {"name": "Status", "value": interview_data['offerStatus'], "inline": True},
+                        {"name": "Rounds", "value": str(ctx["num_rounds"]), "inline": True},
+                        {"name": "Location", "value": loc_str if is_valid_loc else "Unspecified", "inline": True}
+                    ],
+                    "description": description,
+                    "footer": {
+                        "text": f"Roundz AI | Interview Experiences | {datetime.now().strftime('%m/%d/%Y')}"
+                    }
+                }
+
+                # Persisted first, then sent in batches of up to 10 embeds.
+                self.outbox.enqueue("1455048561275306074", embed)
+                self.log(ctx, "Discord notification queued.")
+                self.outbox.flush_if_due()
+        except Exception as dx:
+            self.log(ctx, f"Failed to send Discord notification: {dx}")
+
+        with self._count_lock:
+            self.processed_count += 1
+        mark_leetcode_post_visited(ctx["uuid"])
+        return ctx
+
+
 def run_scraper():
-    print(f"[{datetime.now()}] Starting LeetCode Interview Scraper (v2 - Multi-Step)...")
-    
+    print(f"[{datetime.now()}] Starting LeetCode Interview Scraper (v3 - Pipelined)...")
+
     # 1. Initialize
     setup_leetcode_tracking()
     pg_db = PostgresDB()
     lc_client = LeetCodeClient()
     bedrock = BedrockProcessor()
-    
-    processed_count = 0
+    preclassifier = PreClassifier(
+        reject_threshold=float(PRECLASSIFIER_CONFIG.get("reject_threshold", 0.1)),
+        audit_rate=float(PRECLASSIFIER_CONFIG.get("audit_rate", 0.05)),
+        enabled=PRECLASSIFIER_CONFIG.get("enabled", True)
+    )
+    outbox = DeliveryQueue(get_sender())
+    processor = PostProcessor(pg_db, lc_client, bedrock, outbox, preclassifier)
+    pipeline = Pipeline(processor.build_stages()).start()
+
     skipped_count = 0
-    
-    # Loop for 5 pages
-    for page in range(5):
-        skip = page * 50
-        print(f"\n--- Processing Page {page + 1} (Skip: {skip}) ---")
-        
-        # 2. Fetch Posts
-        print("Fetching posts from LeetCode...")
-        data = lc_client.fetch_discussion_posts(limit=50, skip=skip)
-        
-        if not data or "data" not in data:
-            print("Failed to fetch data or end of pages.")
-            break
-
-        posts = data["data"]["ugcArticleDiscussionArticles"]["edges"]
-        if not posts:
-            print("No posts found. Stopping.")
-            break
-            
-        print(f"Found {len(posts)} posts. Processing...")
-        
-        for edge in posts:
-            node = edge["node"]
-            uuid = node["uuid"]
-            title = node["title"]
-            summary = node["summary"]
-            topic_id = node["topicId"]
-            
-            # 3. Check Visited
-            if is_leetcode_post_visited(uuid):
-                print(f"Skipping {uuid} (Already visited)")
-                skipped_count += 1
-                continue
-                
-            print(f"Processing {uuid}: {title} : {topic_id}")
-            
-            # 3.5 Fetch Full Content
-            post_url = f"https://leetcode.com/discuss/post/{topic_id}/"
-            full_content = lc_client.fetch_post_content(post_url)
-            
-            if not full_content:
-                print(f"  - Failed to scrape content from {post_url}. SKIPPING.")
-                continue
-            
-            content_to_use = full_content
-            print(f"  - Scraped full content url : {post_url} ({len(full_content)} chars)")
-
-            # 4. Step 1: Check Interview & Extract Company
-            company_info = bedrock.extract_company_info(title, content_to_use)
-            
-            if not company_info or not company_info.get("is_interview_experience"):
-                print(f"  - Not an interview experience (or failed extraction).")
-                mark_leetcode_post_visited(uuid)
-                continue
-                
-            company_name = company_info.get("company_name")
-            if not company_name:
-                print("  - Interview experience, but no company name found.")
-                mark_leetcode_post_visited(uuid)
-                continue
-                
-            # 5. Step 2: Get/Create Company in DB
-            company_slug = company_name.lower().replace(" ", "-")
-            company = pg_db.get_or_create_company(company_name, company_slug)
-            print(f"  - Company: {company['name']} ({company['id']})")
-            
-            # 6. Step 3: Fetch Internal Job Roles
-            job_roles = pg_db.get_job_roles_for_company(company['id'])
-            
-            # 7. Step 4: Extract Interview Details with Context
-            extraction = bedrock.extract_interview_details(title, content_to_use, job_roles)
-            if not extraction:
-                print("  - Failed to extract detailed interview info.")
-                # Don't mark visited? Or mark visited? 
-                # If step 1 passed but step 4 failed, it's an error. 
-                # Let's NOT mark visited so we can retry if it's transient.
-                continue
-                
-            # --- CONFIDENCE CHECK ---
-            confidence_score = extraction.get("confidence_score", 0)
-            confidence_reasoning = extraction.get("confidence_reasoning", "No reasoning provided.")
-            interview_rounds = extraction.get("interview_rounds", [])
-            
-            print(f"  - Extraction Score: {confidence_score}/100. Reasoning: {confidence_reasoning}")
-
-            if confidence_score < 70:
-                print(f"  - SKIPPING: Low Confidence Score ({confidence_score}%).")
-                mark_leetcode_post_visited(uuid)
-                continue
-
-            if not interview_rounds:
-                print(f"  - SKIPPING: No interview rounds found.")
-                mark_leetcode_post_visited(uuid)
-                continue
-            # ------------------------
-                
-            try:
-                # Resolve Job Role ID
-                job_role_id = extraction.get("job_role_id")
-                
-                # Validation: Check if returned ID is valid for this company
-                valid_ids = [r['id'] for r in job_roles]
-                if job_role_id not in valid_ids:
-                    print(f"  - Bedrock returned invalid/unknown Job Role ID: {job_role_id}. Falling back.")
-                    # Fallback strategies: 
-                    # 1. Try to find "Software Engineer" in the list
-                    # 2. Pick the first one?
-                    # 3. Use a global default?
-                    # For now, let's try to match by name "Software Engineer" or skip.
-                    
-                    fallback_role = next((r for r in job_roles if "software engineer" in r['name'].lower()), None)
-                    if fallback_role:
-                        job_role_id = fallback_role['id']
-                        print(f"  - Fallback to: {fallback_role['name']}")
-                    elif job_roles:
-                        job_role_id = job_roles[0]['id'] # Desperate fallback
-                        print(f"  - Desperate fallback to first role: {job_roles[0]['name']}")
-                    else:
-                        # No roles at all for this company? 
-                        # We might need to create a default role for the company? 
-                        # Or search global "Software Engineer"?
-                        # Based on user logic: "Query internal Postgres... Go to Job Profile and Job Role..."
-                        # If empty, maybe search global?
-                        global_role = pg_db.get_job_role_by_name("Software Engineer")
-                        if global_role:
-                            job_role_id = global_role['id']
-                            print("  - Fallback to GLOBAL Software Engineer role.")
-                        else:
-                            print("  - CRITICAL: No Job Role found. Skipping.")
-                            mark_leetcode_post_visited(uuid) 
-                            continue
-
-                # Create Interview
-                try:
-                    num_rounds = int(extraction.get("number_of_rounds", 0))
-                except (ValueError, TypeError):
-                    num_rounds = 0
+    # Posts are only marked visited once the pipeline finishes them, so
+    # guard against queueing the same post twice when it shows up on two pages.
+    # Maps uuid -> creation date for the high-water mark bookkeeping.
+    queued = {}
 
-                try:
-                    rating = float(extraction.get("overall_rating", 0))
-                except (ValueError, TypeError):
-                    rating = 0.0
-
-                interview_data = {
-                    "companyId": company['id'],
-                    "userId": "1",
-                    "jobRoleId": job_role_id,
-                    "slug": node['slug'],
-                    "title": title,
-                    "location": extraction.get("location"),
-                    "date": datetime.now(),
-                    "difficulty": extraction.get("interview_difficulty", "Medium").upper(),
-                    "noOfRounds": num_rounds,
-                    "interviewProcess": extraction.get("company_interview_process"),
-                    "preparationSources": extraction.get("preparation_source"),
-                    "overallRating": rating,
-                    "isAnonymous": extraction.get("is_anonymous", False),
-                    "status": "PUBLISHED",
-                    "offerStatus": extraction.get("offer_status", "PENDING").upper()
-                }
-                
-                # ENUM validations
-                valid_difficulties = ["EASY", "MEDIUM", "HARD"]
-                if interview_data["difficulty"] not in valid_difficulties:
-                     interview_data["difficulty"] = "MEDIUM"
-
-                # Mapping
-                status_map = {
-                    "Offer": "OFFERED", 
-                    "Pending": "PENDING", 
-                    "Rejected": "REJECTED",
-                    "Accepted": "OFFERED",
-                    "Declined": "REJECTED"
-                }
-                mapped_status = status_map.get(extraction.get("offer_status"), "PENDING")
-                
-                valid_offer_status = ["OFFERED", "PENDING", "REJECTED"]
-                if mapped_status not in valid_offer_status: mapped_status = "PENDING"
-                
-                interview_data["offerStatus"] = mapped_status
-
-                interview_id = pg_db.create_interview(interview_data)
-                print(f"  - Created Interview: {interview_id}")
-                
-                # Rounds
-                print(f"  - Processing {len(extraction.get('interview_rounds', []))} rounds...")
-                for round_data in extraction.get("interview_rounds", []):
-                    r_diff = round_data.get("difficulty", "Medium").upper()
-                    if r_diff not in valid_difficulties: r_diff = "MEDIUM"
-                    
-                    start_index = 1
-                    try:
-                        start_index = int(round_data.get("sequence", 1))
-                    except:
-                        pass
-
-                    round_db_data = {
-                        "interviewId": interview_id,
-                        "name": round_data.get("name", f"Round {start_index}"),
-                        "duration": round_data.get("duration"),
-                        "difficulty": r_diff,
-                        "experience": round_data.get("experience", ""),
-                        "keyTakeaways": round_data.get("key_takeaways"),
-                        "orderIndex": start_index
-                    }
-                    pg_db.create_interview_round(round_db_data)
+    incremental = CRAWL_MODE == "incremental"
+    order_by = "MOST_RECENT" if incremental else "HOT"
+    high_water_mark = None
+    if incremental:
+        stored = get_crawl_state(HIGH_WATER_MARK_KEY)
+        high_water_mark = parse_creation_date(stored.get("creation_date")) if stored else None
+        print(f"Incremental crawl. High-water mark: {high_water_mark or 'none (full crawl)'}")
+    newest_seen = None
+    listing_complete = False
 
-                # Send Discord Notification
-                try:
-                    discord = DiscordSender()
-                    
-                    # Resolve Job Role Name and Profile Name
-                    role_name = "Software Engineer"
-                    profile_name = "Software Engineering" # Default fallback
-                    if job_roles:
-                         matched_role = next((r for r in job_roles if r['id'] == job_role_id), None)
-                         if matched_role:
-                             role_name = matched_role['name']
-                             profile_name = matched_role.get('profile_name', 'Software Engineering')
-
-                    # Status Colors
-                    color_map = {
-                        "OFFERED": 0x43B581, # Green
-                        "PENDING": 0xFFAA00, # Orange
-                        "REJECTED": 0xF04747  # Red
-                    }
-                    embed_color = color_map.get(interview_data['offerStatus'], 0x3498DB) # Default Blue
-
-                    # Build Description from Rounds
-                    description = ""
-                    for i, r_data in enumerate(extraction.get("interview_rounds", [])):
-                        r_name = r_data.get("name", f"Round {i+1}")
-                        r_exp = r_data.get("experience", "")
-                        # Truncate experience for preview
-                        preview = (r_exp[:150] + '...') if len(r_exp) > 150 else r_exp
-                        # Add emoji based on name keywords
-                        emoji = "🔘"
-                        if "coding" in r_name.lower() or "dsa" in r_name.lower(): emoji = "💻"
-                        elif "system" in r_name.lower() and "design" in r_name.lower(): emoji = "🏗️"
-                        elif "behavioral" in r_name.lower() or "manager" in r_name.lower(): emoji = "💬"
-                        
-                        description += f"{emoji} **{r_name}**\n{preview}\n\n"
-
-                    # Quality Check: Skip if description is empty or contains <UNKNOWN>
-                    if not description.strip() or "<UNKNOWN>" in description:
-                        print(f"  - Discord notification skipped (Low quality/Unknown content).")
-                    else:
-                        # Construct Embed
-                        link = f"https://roundz.ai/interviews/{interview_id}/{interview_data['slug']}"
-                        
-                        # Formatted Title: Company | Job Profile | Job Role | Location (if present) | Offer Status
-                        loc_raw = interview_data.get('location')
-                        loc_str = str(loc_raw).strip() if loc_raw else ""
-                        invalid_locs = ["", "none", "unknown", "null", "<unknown>"]
-                        is_valid_loc = loc_str and loc_str.lower() not in invalid_locs
-                        loc_part = f" | {loc_str}" if is_valid_loc else ""
-                        formatted_title = f"{company['name']} | {profile_name} | {role_name}{loc_part} | {interview_data['offerStatus']}"
-                        
-                        embed = {
-                            "title": formatted_title,
-                            "url": link,
-                            "color": embed_color,
-                            "fields": [
-                                {"name": "Company", "value": company['name'], "inline": True},
-                                {"name": "Role", "value": role_name, "inline": True},
-                                {"name": "Difficulty", "value": interview_data['difficulty'], "inline": True},
-                                {"name": "Status", "value": interview_data['offerStatus'], "inline": True},
-                                {"name": "Rounds", "value": str(num_rounds), "inline": True},
-                                {"name": "Location", "value": loc_str if is_valid_loc else "Unspecified", "inline": True}
-                            ],
-                            "description": description,
-                            "footer": {
-                                "text": f"Roundz AI | Interview Experiences | {datetime.now().strftime('%m/%d/%Y')}"
-                            }
-                        }
-                        
-                        discord.send_message("1455048561275306074", content=None, embed=embed)
-                        print(f"  - Discord notification sent.")
-                except Exception as dx:
-                    print(f"  - Failed to send Discord notification: {dx}")
-                    pass
-                    
-                processed_count += 1
-                mark_leetcode_post_visited(uuid)
-                
-            except Exception as e:
-                print(f"  - Error saving to DB: {e}")
-                pass
+    try:
+        for page in range(MAX_PAGES):
+            skip = page * PAGE_SIZE
+            print(f"\n--- Processing Page {page + 1} (Skip: {skip}) ---")
 
-    print(f"\nTotal Done. Processed: {processed_count}, Skipped: {skipped_count}")
+            # 2. Fetch Posts
+            print("Fetching posts from LeetCode...")
+            data = lc_client.fetch_discussion_posts(limit=PAGE_SIZE, skip=skip, order_by=order_by)
+
+            if not data or "data" not in data:
+                print("Failed to fetch data or end of pages.")
+                break
+
+            listing = data["data"]["ugcArticleDiscussionArticles"]
+            posts = listing["edges"]
+            if not posts:
+                print("No posts found. Stopping.")
+                listing_complete = True
+                break
+
+            print(f"Found {len(posts)} posts. Queueing...")
+            # Picks up posts backfill marked visited since the last page.
+            sync_caches()
+
+            crossed_mark = False
+            for edge in posts:
+                node = edge["node"]
+                uuid = node["uuid"]
+                created = parse_creation_date(node.get("creationDate"))
+
+                if incremental and created is not None:
+                    if high_water_mark is not None and created <= high_water_mark:
+                        crossed_mark = True
+                        break
+                    if newest_seen is None or created > newest_seen:
+                        newest_seen = created
+
+                # 3. Check Visited
+                if uuid in queued or is_leetcode_post_visited(uuid):
+                    print(f"Skipping {uuid} (Already visited)")
+                    skipped_count += 1
+                    continue
+
+                print(f"Processing {uuid}: {node['title']} : {node['topicId']}")
+                queued[uuid] = created
+                # Blocks while the fetch stage is full (backpressure).
+                pipeline.submit({
+                    "node": node,
+                    "uuid": uuid,
+                    "title": node["title"],
+                    "topic_id": node["topicId"],
+                })
+
+            if crossed_mark:
+                print("Reached the high-water mark. Stopping.")
+                listing_complete = True
+                break
+            if not (listing.get("pageInfo") or {}).get("hasNextPage", True):
+                listing_complete = True
+                break
+        else:
+            # Ran out of pages before reaching the mark; anything older than
+            # this listing is left behind, same as the fixed HOT crawl.
+            if incremental and high_water_mark is not None:
+                print(f"Warning: high-water mark not reached within {MAX_PAGES} pages.")
+            listing_complete = True
+    finally:
+        pipeline.close()
+        outbox.flush()
+
+    if incremental and listing_complete and newest_seen is not None:
+        mark = next_high_water_mark(newest_seen, queued)
+        if high_water_mark is None or mark > high_water_mark:
+            set_crawl_state(HIGH_WATER_MARK_KEY, {"creation_date": mark.isoformat()})
+            print(f"High-water mark advanced to {mark.isoformat()}")
+
+    print(f"\nTotal Done. Processed: {processor.processed_count}, Skipped: {skipped_count}")
+    for stage_stats in pipeline.report():
+        print(f"Stage stats: {stage_stats}")
+    print(f"Content sources: {lc_client.content_stats}")
+    print(f"HTTP cache: {lc_client.http_cache.summary()}")
+    print(f"Bedrock calls ({bedrock.extraction_mode}): {bedrock.call_stats}")
+    print(f"Bedrock cache: {bedrock.cache_stats()}")
+    print(f"Prompt trimming: {bedrock.prompt_stats()}")
+    print(f"Pre-classifier: {preclassifier.summary()}")
+    print(f"Bedrock service: {bedrock.bedrock_service.call_stats()}")
+    print(f"Visited-post cache: {cache_stats()[1]}")
+    print(f"Postgres pool: {pg_db.pool_stats()}")
+    print(f"Discord delivery: {outbox.summary()}")
+    outbox.close()
+    pg_db.close()
 
 def main():
     print(f"Starting Scheduled Scraper (Interval: {SCRAPE_INTERVAL_HOURS} hours)")
@@ -333,7 +546,7 @@ def main():
             run_scraper()
         except Exception as e:
             print(f"Critical Error in regular run: {e}")
-        
+
         print(f"Run complete. Sleeping for {SCRAPE_INTERVAL_HOURS} hours...")
         time.sleep(SCRAPE_INTERVAL_HOURS * 3600)
 
@@ -0,0 +1,126 @@
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class Stage:
+    """
+    One step of a Pipeline. `fn` takes an item and returns the item to pass
+    downstream, or None to drop it (already handled, skipped, or failed).
+    """
+
+    def __init__(self, name, fn, workers=1, queue_size=10):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, int(workers))
+        self.queue_size = max(1, int(queue_size))
+
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.forwarded = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self.max_latency = 0.0
+        self.first_start = None
+        self.last_end = None
+
+    def record(self, started, ended, forwarded, error=False):
+        latency = ended - started
+        with self.lock:
+            self.processed += 1
+            self.forwarded += int(forwarded)
+            self.errors += int(error)
+            self.busy_time += latency
+            self.max_latency = max(self.max_latency, latency)
+            if self.first_start is None or started < self.first_start:
+                self.first_start = started
+            if self.last_end is None or ended > self.last_end:
+                self.last_end = ended
+
+    def summary(self):
+        with self.lock:
+            wall = (self.last_end - self.first_start) if self.processed else 0.0
+            return {
+                "stage": self.name,
+                "processed": self.processed,
+                "forwarded": self.forwarded,
+                "errors": self.errors,
+                "avg_latency_s": self.busy_time / self.processed if self.processed else 0.0,
+                "max_latency_s": self.max_latency,
+                "throughput_per_min": self.processed / wall * 60 if wall > 0 else 0.0,
+            }
+
+
+class Pipeline:
+    """
+    Runs items through a chain of stages, each with its own worker threads.
+    Stages are connected by bounded queues, so a slow stage back-pressures
+    the ones before it (and submit() blocks) instead of buffering the
+    whole backlog in memory.
+    """
+
+    def __init__(self, stages):
+        self.stages = stages
+        self.queues = [queue.Queue(maxsize=stage.queue_size) for stage in stages]
+        self.stats = [StageStats(stage.name) for stage in stages]
+        self.threads = [[] for _ in stages]
+        self.started = False
+
+    def start(self):
+        for index, stage in enumerate(self.stages):
+            for worker in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(index,),
+                    name=f"{stage.name}-{worker}",
+                    daemon=True,
+                )
+                thread.start()
+                self.threads[index].append(thread)
+        self.started = True
+        return self
+
+    def submit(self, item):
+        """Feeds an item to the first stage. Blocks while that stage is full."""
+        self.queues[0].put(item)
+
+    def close(self):
+        """Waits for every submitted item to drain through all stages."""
+        for index, stage in enumerate(self.stages):
+            for _ in range(stage.workers):
+                self.queues[index].put(_STOP)
+            for thread in self.threads[index]:
+                thread.join()
+
+    def report(self):
+        return [stats.summary() for stats in self.stats]
+
+    def _worker(self, index):
+        stage = self.stages[index]
+        stats = self.stats[index]
+        inbox = self.queues[index]
+        outbox = self.queues[index + 1] if index + 1 < len(self.queues) else None
+
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                break
+
+            started = time.monotonic()
+            try:
+                result = stage.fn(item)
+            except Exception as e:
+                print(f"  - [{stage.name}] Unhandled error: {e}")
+                stats.record(started, time.monotonic(), forwarded=False, error=True)
+                continue
+
+            forwarded = result is not None
+            stats.record(started, time.monotonic(), forwarded=forwarded)
+            if forwarded and outbox is not None:
+                outbox.put(result)
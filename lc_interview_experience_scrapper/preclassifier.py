@@ -0,0 +1,274 @@
+"""
+Local pre-filter that rejects obvious non-interview posts before any
+Bedrock call.
+
+Every Bedrock classification is appended to a labels file. `train` fits a
+small logistic-regression model on those labels (bag of words from the
+title and the opening of the post, plus the regex rules below as
+features) and prints precision/recall on a held-out split:
+
+    python3 preclassifier.py train
+    python3 preclassifier.py evaluate
+
+Without a trained model nothing is rejected: the rules only flag posts
+(counted as rule_flagged) and every post still goes to Bedrock. Keyword
+rules alone match too many real write-ups ("resources?", "referral",
+"salary") to drop posts on.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "classifier")
+DEFAULT_LABELS_PATH = os.path.join(DATA_DIR, "labels.jsonl")
+DEFAULT_MODEL_PATH = os.path.join(DATA_DIR, "model.json")
+
+# How much of the post body the features (and stored labels) look at.
+BODY_CHARS = 2000
+
+POSITIVE_RULES = {
+    "round": re.compile(r"\b(?:round|onsite|on-site|phone screen|oa|online assessment|hiring manager|bar raiser)\b", re.I),
+    "outcome": re.compile(r"\b(?:offer|rejected|rejection|selected|verdict|ghosted)\b", re.I),
+    "experience": re.compile(r"\binterview (?:experience|process|loop)\b", re.I),
+    "level": re.compile(r"\b(?:l[3-7]|e[3-7]|sde\s?-?[1-3i]+|ic[1-6]|swe\s?-?[1-3i]+|new grad|intern(?:ship)?)\b", re.I),
+}
+NEGATIVE_RULES = {
+    "advice": re.compile(r"\b(?:how (?:to|do|should)|which (?:company|one)|should i|any (?:tips|advice|suggestions))\b", re.I),
+    "prep": re.compile(r"\b(?:study plan|roadmap|resources?|preparation strategy|mock interview partner)\b", re.I),
+    "career": re.compile(r"\b(?:resume review|referral|compensation|salary|layoffs?|job market|switch(?:ing)? jobs?)\b", re.I),
+    "question_title": re.compile(r"\?\s*$"),
+}
+
+
+def _words(text):
+    return re.findall(r"[a-z0-9]+", (text or "").lower())
+
+
+def rule_hits(title, content):
+    text = f"{title}\n{(content or '')[:BODY_CHARS]}"
+    positive = [name for name, rule in POSITIVE_RULES.items() if rule.search(text)]
+    negative = [name for name, rule in NEGATIVE_RULES.items()
+                if rule.search(title if name == "question_title" else text)]
+    return positive, negative
+
+
+def rules_flag(title, content):
+    """True when a post hits a negative rule and no positive one. Advisory only."""
+    positive, negative = rule_hits(title, content)
+    return bool(negative) and not positive
+
+
+def features(title, content):
+    """Sparse binary features: title/body unigrams and bigrams plus rule hits."""
+    feats = set()
+    for prefix, words in (("t", _words(title)), ("b", _words((content or "")[:BODY_CHARS]))):
+        feats.update(f"{prefix}:{word}" for word in words)
+        feats.update(f"{prefix}:{a}_{b}" for a, b in zip(words, words[1:]))
+    positive, negative = rule_hits(title, content)
+    feats.update(f"r+:{name}" for name in positive)
+    feats.update(f"r-:{name}" for name in negative)
+    return feats
+
+
+def _sigmoid(z):
+    if z < -30:
+        return 0.0
+    if z > 30:
+        return 1.0
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+class LinearModel:
+    """Logistic regression over sparse binary features, fitted by SGD with L2."""
+
+    def __init__(self, weights=None, bias=0.0):
+        self.weights = weights or {}
+        self.bias = bias
+
+    def predict_proba(self, feats):
+        return _sigmoid(self.bias + sum(self.weights.get(f, 0.0) for f in feats))
+
+    @classmethod
+    def fit(cls, examples, epochs=15, learning_rate=0.2, l2=1e-4, min_count=2, seed=13):
+        """examples: list of (feature set, 0/1 label)."""
+        counts = {}
+        for feats, _ in examples:
+            for f in feats:
+                counts[f] = counts.get(f, 0) + 1
+        vocab = {f for f, count in counts.items() if count >= min_count}
+        data = [([f for f in feats if f in vocab], label) for feats, label in examples]
+
+        model = cls()
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            rate = learning_rate / (1 + epoch)
+            for feats, label in data:
+                error = model.predict_proba(feats) - label
+                model.bias -= rate * error
+                for f in feats:
+                    w = model.weights.get(f, 0.0)
+                    model.weights[f] = w - rate * (error + l2 * w)
+        model.weights = {f: w for f, w in model.weights.items() if abs(w) > 1e-6}
+        return model
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"bias": self.bias, "weights": self.weights}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["weights"], data["bias"])
+
+
+class PreClassifier:
+    """
+    decide(title, content) returns "reject" for posts that are confidently
+    not interview experiences, else "escalate" (send to Bedrock).
+
+    Only a trained model rejects: posts with a positive rule hit always
+    escalate and the rest are rejected when the model's interview
+    probability is below `reject_threshold`. Without a model every post
+    escalates. A random `audit_rate` share
+    of would-be rejects is escalated anyway; comparing those with Bedrock's
+    answer gives a live estimate of reject precision.
+    """
+
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, labels_path=DEFAULT_LABELS_PATH,
+                 reject_threshold=0.1, audit_rate=0.05, enabled=True):
+        self.labels_path = labels_path
+        self.reject_threshold = reject_threshold
+        self.audit_rate = audit_rate
+        self.enabled = enabled
+        self.model = LinearModel.load(model_path) if model_path and os.path.exists(model_path) else None
+        self.lock = threading.Lock()
+        self.stats = {"rejected": 0, "escalated": 0, "audited": 0, "audit_confirmed": 0, "labels_recorded": 0,
+                      "rule_flagged": 0}
+
+    def score(self, title, content):
+        """Probability that the post is an interview experience (None without a model)."""
+        return self.model.predict_proba(features(title, content)) if self.model else None
+
+    def would_reject(self, title, content):
+        if self.model is None:
+            return False
+        positive, _ = rule_hits(title, content)
+        if positive:
+            return False
+        return self.score(title, content) < self.reject_threshold
+
+    def decide(self, title, content):
+        if self.enabled and self.model is None and rules_flag(title, content):
+            self._count("rule_flagged")
+        if not self.enabled or not self.would_reject(title, content):
+            self._count("escalated")
+            return "escalate"
+        if self.audit_rate and random.random() < self.audit_rate:
+            self._count("audited")
+            return "audit"
+        self._count("rejected")
+        return "reject"
+
+    def record_label(self, uuid, title, content, is_interview, audited=False):
+        """Appends a Bedrock classification to the training labels."""
+        if audited and not is_interview:
+            self._count("audit_confirmed")
+        if not self.labels_path:
+            return
+        line = json.dumps({
+            "uuid": uuid, "title": title, "content": (content or "")[:BODY_CHARS], "label": bool(is_interview)
+        })
+        with self.lock:
+            os.makedirs(os.path.dirname(self.labels_path), exist_ok=True)
+            with open(self.labels_path, "a") as f:
+                f.write(line + "\n")
+            self.stats["labels_recorded"] += 1
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def summary(self):
+        """Counters, Bedrock calls saved, and the audit-based reject precision."""
+        with self.lock:
+            stats = dict(self.stats)
+        stats["bedrock_calls_saved"] = stats["rejected"]
+        stats["audit_precision"] = stats["audit_confirmed"] / stats["audited"] if stats["audited"] else None
+        stats["model"] = self.model is not None
+        return stats
+
+
+def load_labels(path=DEFAULT_LABELS_PATH):
+    """Latest label per post (a post can be relabelled after a retry)."""
+    labels = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                labels[record.get("uuid") or record["title"]] = record
+    return list(labels.values())
+
+
+def is_holdout(record, share=0.2):
+    key = record.get("uuid") or record["title"]
+    return int(hashlib.sha1(key.encode("utf-8")).hexdigest(), 16) % 100 < share * 100
+
+
+def evaluate(would_reject, records):
+    """
+    would_reject(title, content) -> bool. Treats "reject" as the positive class: precision is the share of
+    rejected posts that really were not interviews, recall the share of
+    non-interview posts rejected. interviews_lost counts real interview
+    experiences that would never reach Bedrock.
+    """
+    tp = fp = fn = 0
+    for record in records:
+        rejected = would_reject(record["title"], record["content"])
+        not_interview = not record["label"]
+        tp += rejected and not_interview
+        fp += rejected and not not_interview
+        fn += not rejected and not_interview
+    return {
+        "posts": len(records),
+        "reject_precision": tp / (tp + fp) if tp + fp else None,
+        "reject_recall": tp / (tp + fn) if tp + fn else None,
+        "bedrock_calls_saved": tp + fp,
+        "interviews_lost": fp,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["train", "evaluate"])
+    parser.add_argument("--labels", default=DEFAULT_LABELS_PATH)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    records = load_labels(args.labels)
+    train_set = [r for r in records if not is_holdout(r)]
+    holdout = [r for r in records if is_holdout(r)]
+    print(f"{len(records)} labelled posts ({sum(r['label'] for r in records)} interviews); holdout {len(holdout)}")
+
+    if args.command == "train":
+        model = LinearModel.fit([(features(r["title"], r["content"]), int(r["label"])) for r in train_set])
+        model.save(args.model)
+        print(f"Saved model with {len(model.weights)} weights to {args.model}")
+
+    trained = PreClassifier(model_path=args.model, labels_path=None, reject_threshold=args.threshold)
+    # Rules alone never reject; this shows what they would drop if they did.
+    print(f"Rule flags:   {evaluate(rules_flag, holdout)}")
+    if trained.model:
+        print(f"Rules+model:  {evaluate(trained.would_reject, holdout)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import re
+import threading
+
+# Rough chars-per-token for English prose with markdown; close enough to
+# budget prompts without shipping a tokenizer.
+CHARS_PER_TOKEN = 4
+
+# Lines that carry no interview content: share/vote widgets, link-only
+# lines, sign-offs and the like.
+BOILERPLATE_LINES = re.compile(
+    r"^\s*(?:"
+    r"(?:up)?vote[sd]?|share|report|reply|comments?|\d+\s*(?:views?|votes?|comments?)"
+    r"|read more|show more|edit(?:ed)?:?|thanks(?: for reading)?[.!]*|thank you[.!]*"
+    r"|all the best[.!]*|good luck[.!]*|happy coding[.!]*|please upvote.*|upvote if .*"
+    r"|https?://\S+"
+    r")\s*$",
+    re.IGNORECASE
+)
+MARKDOWN_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+HTML_IMAGE = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+ZERO_WIDTH = re.compile(r"[\u200b-\u200d\u2060\ufeff]")
+INLINE_SPACE = re.compile(r"[ \t\u00a0]+")
+BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def estimate_tokens(text):
+    return (len(text or "") + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def normalize_whitespace(text):
+    """Collapses runs of spaces/tabs, trims every line and keeps at most one blank line in a row."""
+    text = ZERO_WIDTH.sub("", (text or "").replace("\r\n", "\n").replace("\r", "\n"))
+    lines = [INLINE_SPACE.sub(" ", line).strip() for line in text.split("\n")]
+    return BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def strip_boilerplate(text):
+    """Drops images, widget/sign-off lines and exact repeats of earlier lines."""
+    text = HTML_IMAGE.sub("", MARKDOWN_IMAGE.sub("", text or ""))
+    kept, seen = [], set()
+    for line in text.split("\n"):
+        if line and BOILERPLATE_LINES.match(line):
+            continue
+        # Long repeated lines are usually quoted or pasted twice; short ones
+        # ("Round 1", "---") are structure and stay.
+        if len(line) > 40:
+            if line in seen:
+                continue
+            seen.add(line)
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def truncate_to_budget(text, max_tokens):
+    """
+    Cuts text to roughly max_tokens, at the last paragraph or line break
+    inside the budget when there is one near the end.
+    """
+    if not max_tokens or estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max_tokens * CHARS_PER_TOKEN
+    cut = text[:limit]
+    for separator in ("\n\n", "\n", ". "):
+        index = cut.rfind(separator)
+        if index >= limit * 0.8:
+            cut = cut[:index + (1 if separator == ". " else 0)]
+            break
+    return cut.rstrip() + "\n[truncated]"
+
+
+class PromptBudget:
+    """
+    Trims post text before it goes into a Bedrock prompt: whitespace is
+    normalised, boilerplate dropped, and the result truncated to the token
+    budget for that call type. Counts estimated tokens before and after per
+    call type so the saving can be reported.
+
+    Budgets are in estimated tokens; 0 or a missing call type means no
+    truncation (normalisation still applies).
+    """
+
+    def __init__(self, budgets=None, max_job_roles=0, enabled=True):
+        self.budgets = budgets or {}
+        self.max_job_roles = max_job_roles
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def trim(self, call_type, text):
+        if not self.enabled:
+            return text
+        trimmed = truncate_to_budget(strip_boilerplate(normalize_whitespace(text)), self.budgets.get(call_type))
+        self._record(call_type, estimate_tokens(text), estimate_tokens(trimmed))
+        return trimmed
+
+    def record_roles(self, call_type, roles_before, roles_after, tokens_before, tokens_after):
+        """Adds a pruned job-role list to the call type's counts (the call itself is counted by trim)."""
+        with self.lock:
+            entry = self._entry(call_type)
+            entry["roles_before"] += roles_before
+            entry["roles_after"] += roles_after
+            entry["tokens_before"] += tokens_before
+            entry["tokens_after"] += tokens_after
+
+    def _entry(self, call_type):
+        return self.stats.setdefault(call_type, {
+            "calls": 0, "tokens_before": 0, "tokens_after": 0, "roles_before": 0, "roles_after": 0
+        })
+
+    def _record(self, call_type, before, after):
+        with self.lock:
+            entry = self._entry(call_type)
+            entry["calls"] += 1
+            entry["tokens_before"] += before
+            entry["tokens_after"] += after
+
+    def summary(self):
+        """Per call type: totals plus estimated tokens saved overall and per call."""
+        with self.lock:
+            summary = {call_type: dict(entry) for call_type, entry in self.stats.items()}
+        for entry in summary.values():
+            entry["tokens_saved"] = entry["tokens_before"] - entry["tokens_after"]
+            entry["tokens_saved_per_call"] = entry["tokens_saved"] / entry["calls"] if entry["calls"] else 0.0
+        return summary
@@ -0,0 +1,47 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.bedrock_batch import BatchJob, LocalStubBackend
+
+
+def combined_request(title, content):
+    # Same shape as BedrockProcessor.build_combined_request.
+    return {
+        "messages": [{"role": "user", "content": [{"text": f"Title: {title}\nSummary: {content}"}, {"text": "Extract."}]}],
+        "inference_config": {"maxTokens": 4096, "temperature": 0},
+        "tool_config": {
+            "tools": [{"toolSpec": {"name": "interview_classify_and_extract", "inputSchema": {"json": {"type": "object"}}}}],
+            "toolChoice": {"tool": {"name": "interview_classify_and_extract"}},
+        },
+    }
+
+
+def test_local_backend_submit_poll_ingest(tmp_path):
+    posts = {
+        "uuid-1": ("Google | L4 | Bangalore | Offer", "Two coding rounds and a design round."),
+        "uuid-2": ("Amazon SDE2 interview experience", "Online assessment, then three loops."),
+    }
+    job = BatchJob(LocalStubBackend(), str(tmp_path))
+    for uuid, (title, content) in posts.items():
+        job.add(uuid, metadata={"node": {"uuid": uuid, "title": title}, "content": content}, **combined_request(title, content))
+    job.submit()
+
+    # Ingest runs in a later process, from the manifest alone.
+    loaded = BatchJob.load(LocalStubBackend(), job.job_dir)
+    assert loaded.wait(poll_seconds=0, timeout=1) == "Completed"
+
+    results = {record_id: (tool_input, metadata) for record_id, tool_input, metadata in loaded.results()}
+    assert set(results) == set(posts)
+    for uuid, (tool_input, metadata) in results.items():
+        # What backfill.ingest needs to hand a record to the pipeline.
+        assert tool_input["is_interview_experience"] is True
+        assert tool_input["confidence_score"] >= 70
+        assert tool_input["interview_rounds"]
+        assert metadata["content"] == posts[uuid][1]
+
+    assert results["uuid-1"][0]["company_name"] == "Google"
+    assert results["uuid-1"][0]["job_role_name"] == "L4"
+    assert results["uuid-2"][0]["company_name"] == "Amazon"
+    assert results["uuid-2"][0]["job_role_name"] == "Software Engineer"
@@ -0,0 +1,37 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "lc_interview_experience_scrapper"))
+
+from preclassifier import LinearModel, PreClassifier, features, rules_flag
+
+# Real interview write-ups that hit negative keyword rules and no positive one.
+INTERVIEW_POSTS = [
+    ("My Meta journey - resources that helped?", "Got a referral, four interviews over two weeks."),
+    ("Stripe backend engineer, salary discussion included", "Recruiter call, then coding and system design."),
+]
+
+
+def test_rules_alone_never_reject(tmp_path):
+    classifier = PreClassifier(model_path=None, labels_path=None, audit_rate=0)
+    for title, content in INTERVIEW_POSTS:
+        assert rules_flag(title, content)
+        assert not classifier.would_reject(title, content)
+        assert classifier.decide(title, content) == "escalate"
+    stats = classifier.summary()
+    assert stats["rejected"] == 0
+    assert stats["rule_flagged"] == len(INTERVIEW_POSTS)
+
+
+def test_trained_model_rejects_confident_non_interviews(tmp_path):
+    discussion = [("Which company should I join?", "Comparing two offers letters for a friend."),
+                  ("Best study plan for DP", "Looking for a roadmap and tips.")] * 20
+    interviews = [("Google phone screen and onsite", "Round 1 graphs, round 2 design."),
+                  ("Amazon SDE2 interview experience", "OA then three rounds, got the offer.")] * 20
+    model = LinearModel.fit([(features(t, c), 0) for t, c in discussion] + [(features(t, c), 1) for t, c in interviews])
+    model_path = str(tmp_path / "model.json")
+    model.save(model_path)
+
+    classifier = PreClassifier(model_path=model_path, labels_path=None, reject_threshold=0.1, audit_rate=0)
+    assert classifier.decide("Best study plan for DP", "Looking for a roadmap and tips.") == "reject"
+    assert classifier.decide("Google phone screen and onsite", "Round 1 graphs, round 2 design.") == "escalate"
@@ -0,0 +1,40 @@
+import html
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "job_scrapper"))
+
+from yc_scraper import parse_embedded_json, parse_yc_jobs
+
+# A trimmed YC role page: job cards plus the Inertia data-page payload,
+# whose navigation links (title/url pairs) come before the job postings.
+with open(os.path.join(os.path.dirname(__file__), "fixtures", "yc_jobs_page.html"), encoding="utf-8") as f:
+    PAGE = f.read()
+
+EXPECTED_IDS = [
+    "yc-StcNZf7-data-analyst-remote-india",
+    "yc-Kq3LmP2-senior-software-engineer",
+    "yc-a9XwT1c-product-engineer",
+]
+
+
+def test_auto_parses_the_job_cards():
+    jobs = parse_yc_jobs(PAGE, "auto")
+    assert [job.id for job in jobs] == EXPECTED_IDS
+    assert jobs[1].salary == "$180K - $230K"
+    assert jobs[1].location == "San Francisco, CA, US"
+
+
+def test_json_backend_skips_navigation_and_matches_bs4():
+    json_jobs = parse_yc_jobs(PAGE, "json")
+    # Same records, IDs included, so switching backends re-announces nothing.
+    assert json_jobs == parse_yc_jobs(PAGE, "bs4")
+    assert [job.id for job in json_jobs] == EXPECTED_IDS
+
+
+def test_json_backend_ignores_lists_without_job_links():
+    props = {"props": {"navLinks": [{"title": "About", "url": "/about"}]}}
+    page = f'<div id="app" data-page="{html.escape(json.dumps(props))}"></div>'
+    assert parse_embedded_json(page) is None
@@ -1,36 +1,75 @@
-import boto3
-import json
-import os
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.rate_limiter import AIMDLimiter
+from utils.settings import get_settings
+
+# Error codes Bedrock returns when it wants the caller to slow down.
+THROTTLE_CODES = {"ThrottlingException", "TooManyRequestsException", "ServiceUnavailableException"}
+# Server-side failures worth another attempt that say nothing about load,
+# so they are retried without shrinking the in-flight limit.
+TRANSIENT_CODES = {"InternalServerException", "ModelTimeoutException", "ModelNotReadyException"}
 
 class BedrockService:
     def __init__(self):
         # Load configuration
-        try:
-            config_path = os.path.join(os.path.dirname(__file__), "config.json")
-            with open(config_path, "r") as f:
-                config = json.load(f)
-                self.model_id = config.get("bedrock", {}).get("model_id", "anthropic.claude-3-5-sonnet-20240620-v1:0")
-                self.region = config.get("bedrock", {}).get("region", "us-east-1")
-                self.access_key = config.get("bedrock", {}).get("aws_access_key_id")
-                self.secret_key = config.get("bedrock", {}).get("aws_secret_access_key")
-        except FileNotFoundError:
+        settings = get_settings()
+        if not settings.found:
             print("Warning: config.json not found in utils directory. Relying on default AWS credentials.")
-            self.model_id = "anthropic.claude-3-5-sonnet-20240620-v1:0"
-            self.region = "us-east-1"
-            self.access_key = None
-            self.secret_key = None
+        bedrock_config = settings.section("bedrock")
+        self.model_id = bedrock_config.get("model_id", "anthropic.claude-3-5-sonnet-20240620-v1:0")
+        self.region = bedrock_config.get("region", "us-east-1")
+        self.access_key = bedrock_config.get("aws_access_key_id")
+        self.secret_key = bedrock_config.get("aws_secret_access_key")
+        concurrency_config = bedrock_config.get("concurrency", {})
+
+        self.max_retries = concurrency_config.get("max_retries", 6)
+        self.backoff_base_seconds = concurrency_config.get("backoff_base_seconds", 1.0)
+        self.backoff_max_seconds = concurrency_config.get("backoff_max_seconds", 30.0)
+        self.limiter = AIMDLimiter(
+            initial=concurrency_config.get("initial_in_flight", 4),
+            minimum=1,
+            maximum=concurrency_config.get("max_in_flight", 8)
+        )
+        self.stats_lock = threading.Lock()
+        self.latencies = deque(maxlen=concurrency_config.get("latency_window", 1000))
+        self.stats = {"calls": 0, "errors": 0, "throttles": 0, "retries": 0, "input_tokens": 0, "output_tokens": 0}
+        self._executor = None
+
+        # boto3 takes a large share of startup time, so it is only imported
+        # once a service is actually built. botocore's own retries are
+        # disabled so throttles reach the adaptive limiter instead of being
+        # absorbed.
+        import boto3
+        from botocore.config import Config
+
+        self.client = boto3.client(
+            config=Config(
+                retries={"max_attempts": 1, "mode": "standard"},
+                max_pool_connections=max(10, self.limiter.maximum)
+            ),
+            **self.client_kwargs("bedrock-runtime")
+        )
 
-        # Initialize boto3 client
-        client_kwargs = {"service_name": "bedrock-runtime", "region_name": self.region}
+    def client_kwargs(self, service_name):
+        """boto3.client kwargs for any AWS service using this config's region and credentials."""
+        client_kwargs = {"service_name": service_name, "region_name": self.region}
         if self.access_key and self.secret_key:
             client_kwargs["aws_access_key_id"] = self.access_key
             client_kwargs["aws_secret_access_key"] = self.secret_key
-            
-        self.client = boto3.client(**client_kwargs)
+        return client_kwargs
 
     def converse(self, messages, tool_config=None, inference_config=None):
         """
         Generic wrapper for Bedrock converse API.
+
+        Waits for a slot from the adaptive in-flight limiter and retries
+        throttling errors, transient server errors and connection/read
+        timeouts with jittered exponential backoff.
         
         Args:
             messages (list): List of message objects [{"role": "user", "content": [...]}]
@@ -52,12 +91,111 @@ class BedrockService:
         if tool_config:
             kwargs["toolConfig"] = tool_config
 
-        try:
-            response = self.client.converse(**kwargs)
-            return response
-        except Exception as e:
-            print(f"Bedrock Service Error: {e}")
-            raise e
+        from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, HTTPClientError
+
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            start = time.monotonic()
+            try:
+                response = self.client.converse(**kwargs)
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if code not in THROTTLE_CODES | TRANSIENT_CODES or attempt == self.max_retries:
+                    self._record_error()
+                    print(f"Bedrock Service Error: {e}")
+                    raise e
+                delay = self._retry_delay(attempt, code, throttled=code in THROTTLE_CODES)
+            except (BotoConnectionError, HTTPClientError) as e:
+                # Connect/read timeouts and dropped connections, which
+                # botocore's own retries used to absorb.
+                if attempt == self.max_retries:
+                    self._record_error()
+                    print(f"Bedrock Service Error: {e}")
+                    raise e
+                delay = self._retry_delay(attempt, type(e).__name__, throttled=False)
+            except Exception as e:
+                self._record_error()
+                print(f"Bedrock Service Error: {e}")
+                raise e
+            else:
+                self.limiter.on_success()
+                self._record_success(time.monotonic() - start, response.get("usage", {}))
+                return response
+            finally:
+                self.limiter.release()
+            time.sleep(delay)
+
+    def converse_many(self, requests):
+        """
+        Runs many converse calls in parallel. Each request is a dict of
+        converse() keyword arguments; results come back in the same order,
+        with the exception in place of the response for calls that failed.
+        """
+        futures = [self._get_executor().submit(self.converse, **request) for request in requests]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    async def converse_async(self, messages, tool_config=None, inference_config=None):
+        """converse() on the service's thread pool, for use from an event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), lambda: self.converse(messages, tool_config, inference_config)
+        )
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self.stats_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.limiter.maximum, thread_name_prefix="bedrock")
+        return self._executor
+
+    def _retry_delay(self, attempt, reason, throttled):
+        """Backoff before the next attempt. Only throttles count against the in-flight limit."""
+        if throttled:
+            self.limiter.on_throttle()
+        delay = self._backoff_delay(attempt)
+        with self.stats_lock:
+            self.stats["retries"] += 1
+            if throttled:
+                self.stats["throttles"] += 1
+        what = "throttled" if throttled else "transient error"
+        print(f"Bedrock {what} ({reason}); retrying in {delay:.1f}s (limit now {int(self.limiter.limit)})")
+        return delay
+
+    def _backoff_delay(self, attempt):
+        # Full jitter: uniform over [0, base * 2^attempt], capped.
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** attempt)))
+
+    def _record_success(self, latency, usage):
+        with self.stats_lock:
+            self.latencies.append(latency)
+            self.stats["calls"] += 1
+            self.stats["input_tokens"] += usage.get("inputTokens", 0)
+            self.stats["output_tokens"] += usage.get("outputTokens", 0)
+
+    def _record_error(self):
+        with self.stats_lock:
+            self.stats["errors"] += 1
+
+    def call_stats(self):
+        """Counters plus p50/p90/p99 latency over the recent call window."""
+        with self.stats_lock:
+            stats = dict(self.stats)
+            latencies = sorted(self.latencies)
+        for pct in (50, 90, 99):
+            stats[f"p{pct}_latency"] = latencies[min(len(latencies) - 1, int(pct / 100 * len(latencies)))] if latencies else 0.0
+        stats["in_flight_limit"] = int(self.limiter.limit)
+        return stats
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
 
     def extract_tool_result(self, response):
         """
@@ -1,13 +1,185 @@
 import sqlite3
 import os
+import json
+import threading
+import atexit
+from contextlib import contextmanager
+from utils.membership_cache import MembershipCache
 
 DB_NAME = os.path.join(os.path.dirname(__file__), "jobs.db")
 
+# Applied once when the shared connection is opened.
+# WAL lets the LeetCode scraper read while the job bot writes, and
+# synchronous=NORMAL is durable enough for dedup bookkeeping under WAL.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Statements are kept as module constants so sqlite3's statement cache
+# re-uses the prepared form on every call.
+SQL_INSERT_JOB = '''
+    INSERT OR IGNORE INTO seen_jobs (job_id, title, company, url)
+    VALUES (?, ?, ?, ?)
+'''
+SQL_JOB_SEEN = 'SELECT 1 FROM seen_jobs WHERE job_id = ?'
+# The whole ID list is bound as one JSON array so a batch of any size is a
+# single statement (no SQLITE_MAX_VARIABLE_NUMBER chunking).
+SQL_FILTER_UNSEEN = '''
+    SELECT DISTINCT value FROM json_each(?)
+    WHERE value NOT IN (SELECT job_id FROM seen_jobs)
+'''
+# Rows are only ever inserted, so rowid order is insertion order and a
+# cache can catch up on other processes' writes from its last rowid.
+SQL_JOB_IDS_AFTER = 'SELECT rowid, job_id FROM seen_jobs WHERE rowid > ? ORDER BY rowid'
+SQL_POST_UUIDS_AFTER = 'SELECT rowid, uuid FROM visited_leetcode_posts WHERE rowid > ? ORDER BY rowid'
+SQL_GET_CRAWL_STATE = 'SELECT value FROM crawl_state WHERE key = ?'
+SQL_SET_CRAWL_STATE = '''
+    INSERT INTO crawl_state (key, value, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+'''
+SQL_POST_VISITED = 'SELECT 1 FROM visited_leetcode_posts WHERE uuid = ?'
+SQL_MARK_POST_VISITED = 'INSERT OR IGNORE INTO visited_leetcode_posts (uuid) VALUES (?)'
+
+_conn = None
+_lock = threading.RLock()
+_tx_depth = 0
+
+# Front caches so steady-state dedup checks never reach SQLite. They are
+# warm-started by init_db / setup_leetcode_tracking and are only consulted
+# once loaded. Other processes write the same file (the job bot, the
+# LeetCode scraper and backfill), so sync_caches() pulls in rows they have
+# committed: filter_unseen runs it once per batch, and callers of the
+# per-key checks run it once per page or cycle.
+seen_jobs_cache = MembershipCache("seen_jobs")
+visited_posts_cache = MembershipCache("visited_leetcode_posts")
+_CACHED_TABLES = ((seen_jobs_cache, SQL_JOB_IDS_AFTER), (visited_posts_cache, SQL_POST_UUIDS_AFTER))
+_cache_rowids = {}  # cache name -> highest rowid already in that cache
+_data_version = None
+
+def get_connection():
+    """Returns the process-wide SQLite connection, opening it on first use."""
+    global _conn
+    with _lock:
+        if _conn is None:
+            # isolation_level=None: we issue BEGIN/COMMIT ourselves so a
+            # batch of writes inside transaction() commits exactly once.
+            _conn = sqlite3.connect(
+                DB_NAME,
+                check_same_thread=False,
+                isolation_level=None,
+                cached_statements=64,
+            )
+            for pragma in PRAGMAS:
+                _conn.execute(pragma)
+        return _conn
+
+def close_db():
+    """Closes the shared connection. The next call re-opens it."""
+    global _conn, _tx_depth, _data_version
+    with _lock:
+        if _conn is not None:
+            if _conn.in_transaction:
+                _conn.commit()
+            _conn.close()
+            _conn = None
+            _tx_depth = 0
+            _data_version = None
+            _cache_rowids.clear()
+            seen_jobs_cache.clear()
+            visited_posts_cache.clear()
+
+atexit.register(close_db)
+
+@contextmanager
+def transaction():
+    """
+    Groups every write made inside the block into a single commit.
+    Nested blocks join the outermost transaction. The connection lock is
+    held for the duration, so other threads wait rather than interleave.
+    """
+    global _tx_depth
+    with _lock:
+        conn = get_connection()
+        if _tx_depth == 0:
+            conn.execute("BEGIN IMMEDIATE")
+        _tx_depth += 1
+        try:
+            yield conn
+        except BaseException:
+            _tx_depth -= 1
+            if _tx_depth == 0:
+                conn.execute("ROLLBACK")
+                # Writes in the block already updated the caches; rebuild
+                # them so rolled-back IDs are not reported as seen.
+                _reload_caches()
+            raise
+        else:
+            _tx_depth -= 1
+            if _tx_depth == 0:
+                conn.execute("COMMIT")
+
+def _execute(sql, params=()):
+    with _lock:
+        return get_connection().execute(sql, params)
+
+def _load_cache(cache, sql):
+    with _lock:
+        rows = _execute(sql, (0,)).fetchall()
+        cache.load(key for _, key in rows)
+        _cache_rowids[cache.name] = rows[-1][0] if rows else 0
+
+def _reload_caches():
+    for cache, sql in _CACHED_TABLES:
+        if cache.loaded:
+            _load_cache(cache, sql)
+
+def sync_caches():
+    """
+    Adds rows other processes committed since the last sync to the loaded
+    caches, so a Bloom negative never hides a row they wrote. PRAGMA
+    data_version only changes for other connections' commits; when it has
+    moved, only rows past each cache's last rowid are read.
+    """
+    global _data_version
+    with _lock:
+        if not any(cache.loaded for cache, _ in _CACHED_TABLES):
+            return
+        version = _execute("PRAGMA data_version").fetchone()[0]
+        if version == _data_version:
+            return
+        _data_version = version
+        for cache, sql in _CACHED_TABLES:
+            if cache.loaded:
+                rows = _execute(sql, (_cache_rowids.get(cache.name, 0),)).fetchall()
+                for _, key in rows:
+                    cache.add(key)
+                if rows:
+                    _cache_rowids[cache.name] = rows[-1][0]
+
+def _cached_exists(cache, sql, key):
+    """Answers from the cache when it can, otherwise asks SQLite and remembers positives."""
+    with _lock:
+        if cache.loaded:
+            cached = cache.lookup(key)
+            if cached is not None:
+                return cached
+        seen = _execute(sql, (key,)).fetchone() is not None
+        if seen and cache.loaded:
+            cache.remember(key)
+        return seen
+
+def cache_stats():
+    """Hit/miss counters for the seen-job and visited-post caches."""
+    with _lock:
+        return [seen_jobs_cache.stats(), visited_posts_cache.stats()]
+
 def init_db():
     """Initializes the database and creates the table if it doesn't exist."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute('''
+    _execute('''
         CREATE TABLE IF NOT EXISTS seen_jobs (
             job_id TEXT PRIMARY KEY,
             title TEXT,
@@ -16,65 +188,135 @@ def init_db():
             date_added TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
-    conn.commit()
-    conn.close()
+    _load_cache(seen_jobs_cache, SQL_JOB_IDS_AFTER)
+
+def job_key(job):
+    """Returns the dedup key for a JobRecord. Sources fill in a title-company ID when the board has none."""
+    return job.id
+
+def _job_row(job):
+    return (job_key(job), job.title, job.company, job.job_url)
 
 def add_job(job):
     """Adds a job to the database."""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR IGNORE INTO seen_jobs (job_id, title, company, url)
-            VALUES (?, ?, ?, ?)
-        ''', (job['id'], job['title'], job['company'], job['job_url']))
-        conn.commit()
-        conn.close()
+        with _lock:
+            row = _job_row(job)
+            _execute(SQL_INSERT_JOB, row)
+            if seen_jobs_cache.loaded:
+                seen_jobs_cache.add(row[0])
         return True
     except Exception as e:
         print(f"Error adding job: {e}")
         return False
 
+def add_jobs(jobs):
+    """Adds a batch of jobs with one executemany. Returns the number of new rows."""
+    rows = [_job_row(job) for job in jobs]
+    if not rows:
+        return 0
+    try:
+        with transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(SQL_INSERT_JOB, rows)
+            if seen_jobs_cache.loaded:
+                for row in rows:
+                    seen_jobs_cache.add(row[0])
+            return conn.total_changes - before
+    except Exception as e:
+        print(f"Error adding jobs: {e}")
+        return 0
+
 def is_job_seen(job_id):
-    """Checks if a job has already been seen."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute('SELECT 1 FROM seen_jobs WHERE job_id = ?', (job_id,))
-    result = cursor.fetchone()
-    conn.close()
-    return result is not None
+    """Checks if a job has already been seen (other processes' writes as of the last sync_caches())."""
+    return _cached_exists(seen_jobs_cache, SQL_JOB_SEEN, str(job_id))
+
+def filter_unseen(job_ids):
+    """
+    Returns the subset of job_ids not yet in seen_jobs. IDs the cache can
+    answer are resolved in memory; the rest go to SQLite in one query.
+    """
+    job_ids = [str(job_id) for job_id in job_ids]
+    with _lock:
+        sync_caches()
+        unseen = set()
+        unknown = []
+        for job_id in job_ids:
+            cached = seen_jobs_cache.lookup(job_id) if seen_jobs_cache.loaded else None
+            if cached is None:
+                unknown.append(job_id)
+            elif not cached:
+                unseen.add(job_id)
+        if unknown:
+            rows = _execute(SQL_FILTER_UNSEEN, (json.dumps(unknown),)).fetchall()
+            db_unseen = {row[0] for row in rows}
+            unseen |= db_unseen
+            if seen_jobs_cache.loaded:
+                for job_id in set(unknown) - db_unseen:
+                    seen_jobs_cache.remember(job_id)
+    return unseen
+
+def record_new_jobs(jobs):
+    """
+    Dedups a scraped batch (a list of JobRecords, e.g. from fetch_jobs or
+    scrape_yc_jobs) against seen_jobs and within itself, stores the new
+    ones and returns them in their original order. Two statements total.
+    """
+    with transaction():
+        unseen = filter_unseen(job_key(job) for job in jobs)
+        new_jobs = []
+        for job in jobs:
+            key = job_key(job)
+            if key in unseen:
+                unseen.discard(key)
+                new_jobs.append(job)
+        add_jobs(new_jobs)
+    return new_jobs
 
 def setup_leetcode_tracking():
     """Initializes the table for tracking visited LeetCode posts."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute('''
+    _execute('''
         CREATE TABLE IF NOT EXISTS visited_leetcode_posts (
             uuid TEXT PRIMARY KEY,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
-    conn.commit()
-    conn.close()
+    _execute('''
+        CREATE TABLE IF NOT EXISTS crawl_state (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    _load_cache(visited_posts_cache, SQL_POST_UUIDS_AFTER)
 
 def is_leetcode_post_visited(uuid):
-    """Checks if a LeetCode post has already been processed."""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    cursor.execute('SELECT 1 FROM visited_leetcode_posts WHERE uuid = ?', (uuid,))
-    result = cursor.fetchone()
-    conn.close()
-    return result is not None
+    """Checks if a LeetCode post has already been processed (other processes' writes as of the last sync_caches())."""
+    return _cached_exists(visited_posts_cache, SQL_POST_VISITED, uuid)
 
 def mark_leetcode_post_visited(uuid):
     """Marks a LeetCode post as processed."""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute('INSERT OR IGNORE INTO visited_leetcode_posts (uuid) VALUES (?)', (uuid,))
-        conn.commit()
-        conn.close()
+        with _lock:
+            _execute(SQL_MARK_POST_VISITED, (uuid,))
+            if visited_posts_cache.loaded:
+                visited_posts_cache.add(uuid)
         return True
     except Exception as e:
         print(f"Error marking post as visited: {e}")
         return False
+
+def get_crawl_state(key):
+    """Returns a stored crawl checkpoint (e.g. the LeetCode high-water mark), or None."""
+    with _lock:
+        row = _execute(SQL_GET_CRAWL_STATE, (key,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+def set_crawl_state(key, value):
+    """Stores a JSON-serialisable crawl checkpoint under key."""
+    try:
+        _execute(SQL_SET_CRAWL_STATE, (key, json.dumps(value)))
+        return True
+    except Exception as e:
+        print(f"Error saving crawl state: {e}")
+        return False
@@ -0,0 +1,274 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from utils.discord_service import DiscordDeliveryError
+
+DEFAULT_OUTBOX_PATH = os.path.join(os.path.dirname(__file__), "discord_outbox.db")
+
+# Discord's per-message limits.
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+
+def embed_size(embed):
+    """Characters that count towards Discord's 6000-per-message embed limit."""
+    size = len(embed.get("title") or "") + len(embed.get("description") or "")
+    size += len((embed.get("footer") or {}).get("text") or "")
+    size += len((embed.get("author") or {}).get("name") or "")
+    for field in embed.get("fields") or []:
+        size += len(field.get("name") or "") + len(field.get("value") or "")
+    return size
+
+
+def pack_embeds(rows):
+    """Groups (id, embed) rows, in order, into messages within Discord's limits."""
+    batch, batch_size = [], 0
+    for row_id, embed in rows:
+        size = embed_size(embed)
+        if batch and (len(batch) == MAX_EMBEDS_PER_MESSAGE or batch_size + size > MAX_EMBED_CHARS_PER_MESSAGE):
+            yield batch
+            batch, batch_size = [], 0
+        batch.append((row_id, embed))
+        batch_size += size
+    if batch:
+        yield batch
+
+
+class DeliveryQueue:
+    """
+    Persistent outbox for Discord embeds.
+
+    enqueue() writes to a small SQLite file first, so notifications survive
+    a crash between scraping and sending; flush() packs pending embeds into
+    as few messages as Discord allows and deletes them once delivered.
+    Transient failures back off per row and are retried on a later flush;
+    embeds Discord rejects outright are kept with status 'failed' for
+    inspection.
+
+    The job bot, the LeetCode scraper and backfill share one outbox file.
+    A flush first claims its rows in a single write transaction (status
+    'sending' plus an owner token), so two processes never send the same
+    row, and a channel with rows in flight is left to the flush sending it
+    so its messages stay in order. Claims left behind by a process that
+    died mid-flush go back to 'pending' after CLAIM_TIMEOUT_SECONDS.
+    """
+
+    CLAIM_TIMEOUT_SECONDS = 600
+
+    def __init__(self, sender, path=DEFAULT_OUTBOX_PATH, max_attempts=8, max_delay_seconds=60):
+        self.sender = sender
+        self.max_attempts = max_attempts
+        self.max_delay_seconds = max_delay_seconds
+        # Guards the connection and stats only; never held while sending.
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel_id TEXT NOT NULL,
+                embed TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER DEFAULT 0,
+                next_attempt_at REAL DEFAULT 0,
+                status TEXT DEFAULT 'pending',
+                last_error TEXT,
+                owner TEXT,
+                claimed_at REAL
+            )
+        ''')
+        # Outbox files created before rows were claimed lack these columns.
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(outbox)")}
+        for column, kind in (("owner", "TEXT"), ("claimed_at", "REAL")):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE outbox ADD COLUMN {column} {kind}")
+        self.conn.execute('CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (status, channel_id, id)')
+        self.stats = {"enqueued": 0, "delivered": 0, "messages": 0, "retries": 0, "failed": 0}
+
+    def enqueue(self, channel_id, embed):
+        with self.lock:
+            self.conn.execute(
+                'INSERT INTO outbox (channel_id, embed, created_at) VALUES (?, ?, ?)',
+                (str(channel_id), json.dumps(embed), time.time())
+            )
+            self.stats["enqueued"] += 1
+
+    def enqueue_many(self, channel_id, embeds):
+        with self.lock:
+            now = time.time()
+            self.conn.executemany(
+                'INSERT INTO outbox (channel_id, embed, created_at) VALUES (?, ?, ?)',
+                [(str(channel_id), json.dumps(embed), now) for embed in embeds]
+            )
+            self.stats["enqueued"] += len(embeds)
+
+    def pending_count(self):
+        """Embeds not yet delivered, including any another flush is sending right now."""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status IN ('pending', 'sending')"
+            ).fetchone()[0]
+
+    def flush_if_due(self):
+        """Flushes once a full message is waiting or the oldest embed has waited max_delay_seconds."""
+        with self.lock:
+            count, oldest = self.conn.execute(
+                "SELECT COUNT(*), MIN(created_at) FROM outbox WHERE status = 'pending'"
+            ).fetchone()
+        if count >= MAX_EMBEDS_PER_MESSAGE or (oldest is not None and time.time() - oldest >= self.max_delay_seconds):
+            return self.flush()
+        return 0
+
+    async def flush_async(self):
+        """flush() on a worker thread, for callers on an event loop."""
+        return await asyncio.to_thread(self.flush)
+
+    def flush(self):
+        """Sends every pending embed that is not backing off. Returns how many were delivered."""
+        owner = uuid.uuid4().hex
+        claimed = self._claim(owner)
+        delivered = 0
+        try:
+            for channel_id, rows in claimed.items():
+                delivered += self._flush_channel(channel_id, rows)
+        finally:
+            self._release(owner)
+        return delivered
+
+    def _claim(self, owner):
+        """
+        Marks this flush's rows as 'sending' in one write transaction and
+        returns them as {channel_id: [(id, embed), ...]} in id order.
+        """
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute(
+                    "UPDATE outbox SET status = 'pending', owner = NULL WHERE status = 'sending' AND claimed_at < ?",
+                    (now - self.CLAIM_TIMEOUT_SECONDS,)
+                )
+                row_ids = []
+                for channel_id, in self.conn.execute(
+                    "SELECT DISTINCT channel_id FROM outbox WHERE status = 'pending' AND channel_id NOT IN "
+                    "(SELECT channel_id FROM outbox WHERE status = 'sending')"
+                ).fetchall():
+                    for row_id, next_attempt_at in self.conn.execute(
+                        "SELECT id, next_attempt_at FROM outbox WHERE status = 'pending' AND channel_id = ? ORDER BY id",
+                        (channel_id,)
+                    ).fetchall():
+                        # Stop at the first embed still backing off so the channel stays in order.
+                        if next_attempt_at > now:
+                            break
+                        row_ids.append(row_id)
+                rows = self.conn.execute(
+                    "UPDATE outbox SET status = 'sending', owner = ?, claimed_at = ? "
+                    "WHERE status = 'pending' AND id IN (SELECT value FROM json_each(?)) "
+                    "RETURNING id, channel_id, embed",
+                    (owner, now, json.dumps(row_ids))
+                ).fetchall()
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        claimed = {}
+        for row_id, channel_id, embed in sorted(rows):
+            claimed.setdefault(channel_id, []).append((row_id, json.loads(embed)))
+        return claimed
+
+    def _release(self, owner):
+        """Returns claimed rows this flush did not get to (after a deferral) to 'pending'."""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE outbox SET status = 'pending', owner = NULL WHERE status = 'sending' AND owner = ?", (owner,)
+            )
+
+    def _flush_channel(self, channel_id, rows):
+        delivered = 0
+        for batch in pack_embeds(rows):
+            try:
+                self.sender.post_message(channel_id, {"embeds": [embed for _, embed in batch]})
+            except DiscordDeliveryError as e:
+                if e.retryable:
+                    self._back_off([row_id for row_id, _ in batch], str(e))
+                    # Keep channel order: later embeds wait for this batch.
+                    break
+                sent, deferred = self._send_individually(channel_id, batch)
+                delivered += sent
+                if deferred:
+                    break
+                continue
+            self._delete([row_id for row_id, _ in batch])
+            delivered += len(batch)
+        return delivered
+
+    def _send_individually(self, channel_id, batch):
+        """
+        A rejected batch is retried one embed at a time so one bad embed
+        doesn't sink the rest. Returns (delivered, deferred); deferred means
+        a transient failure stopped the channel for this flush.
+        """
+        delivered = 0
+        for row_id, embed in batch:
+            try:
+                self.sender.post_message(channel_id, {"embeds": [embed]})
+            except DiscordDeliveryError as e:
+                if e.retryable:
+                    self._back_off([row_id], str(e))
+                    return delivered, True
+                else:
+                    with self.lock:
+                        self.conn.execute(
+                            "UPDATE outbox SET status = 'failed', owner = NULL, last_error = ? WHERE id = ?",
+                            (str(e), row_id)
+                        )
+                        self.stats["failed"] += 1
+                    print(f"Discord rejected embed {row_id}: {e}")
+                continue
+            self._delete([row_id])
+            delivered += 1
+        return delivered, False
+
+    def _back_off(self, row_ids, error):
+        now = time.time()
+        with self.lock:
+            for row_id in row_ids:
+                attempts = self.conn.execute('SELECT attempts FROM outbox WHERE id = ?', (row_id,)).fetchone()[0] + 1
+                if attempts >= self.max_attempts:
+                    self.conn.execute(
+                        "UPDATE outbox SET attempts = ?, status = 'failed', owner = NULL, last_error = ? WHERE id = ?",
+                        (attempts, error, row_id)
+                    )
+                    self.stats["failed"] += 1
+                else:
+                    self.conn.execute(
+                        "UPDATE outbox SET attempts = ?, next_attempt_at = ?, status = 'pending', owner = NULL, "
+                        "last_error = ? WHERE id = ?",
+                        (attempts, now + min(3600, 30 * 2 ** attempts), error, row_id)
+                    )
+                    self.stats["retries"] += 1
+        print(f"Discord delivery deferred for {len(row_ids)} embeds: {error}")
+
+    def _delete(self, row_ids):
+        """Drops delivered rows and counts them as one message."""
+        with self.lock:
+            self.conn.executemany('DELETE FROM outbox WHERE id = ?', [(row_id,) for row_id in row_ids])
+            self.stats["messages"] += 1
+            self.stats["delivered"] += len(row_ids)
+
+    def summary(self):
+        with self.lock:
+            stats = dict(self.stats)
+        stats["pending"] = self.pending_count()
+        return stats
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
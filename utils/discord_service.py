@@ -1,12 +1,89 @@
+import asyncio
 import requests
-import json
-import os
+import random
+import threading
+import time
+from requests.adapters import HTTPAdapter
+
+from utils.settings import get_settings
+
+
+class DiscordDeliveryError(Exception):
+    """A message could not be delivered. `retryable` is False for requests Discord rejected outright."""
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class RateLimitBuckets:
+    """
+    Tracks Discord's per-route rate-limit buckets from the X-RateLimit-*
+    response headers so requests wait for a bucket reset instead of
+    running into a 429. Shared by every sender in the process.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.route_buckets = {}
+        self.buckets = {}
+        self.global_until = 0.0
+
+    def wait_time(self, route):
+        now = time.monotonic()
+        with self.lock:
+            wait = max(0.0, self.global_until - now)
+            remaining, reset_at = self.buckets.get(self.route_buckets.get(route, route), (1, 0.0))
+            if remaining <= 0 and reset_at > now:
+                wait = max(wait, reset_at - now)
+        return wait
+
+    def update(self, route, headers):
+        bucket = headers.get("X-RateLimit-Bucket")
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if remaining is None or reset_after is None:
+            return
+        with self.lock:
+            if bucket:
+                self.route_buckets[route] = bucket
+            key = self.route_buckets.get(route, route)
+            self.buckets[key] = (int(remaining), time.monotonic() + float(reset_after))
+
+    def on_rate_limited(self, route, retry_after, is_global=False):
+        until = time.monotonic() + retry_after
+        with self.lock:
+            if is_global:
+                self.global_until = max(self.global_until, until)
+            else:
+                self.buckets[self.route_buckets.get(route, route)] = (0, until)
+
+
+_buckets = RateLimitBuckets()
+_sender = None
+_sender_lock = threading.Lock()
+
+
+def get_sender():
+    """The process-wide DiscordSender, so every caller shares one connection pool."""
+    global _sender
+    if _sender is None:
+        with _sender_lock:
+            if _sender is None:
+                _sender = DiscordSender()
+    return _sender
+
 
 class DiscordSender:
+    """
+    Long-lived Discord REST client. Requests go through one pooled
+    requests.Session, so repeated sends reuse the keep-alive TLS connection
+    instead of paying a handshake per message. Prefer get_sender() over
+    constructing one per message.
+    """
+
     def __init__(self):
-        config_path = os.path.join(os.path.dirname(__file__), "config.json")
-        with open(config_path, "r") as f:
-            self.config = json.load(f)
+        self.config = get_settings()
         
         self.token = self.config.get("discord_token")
         self.base_url = "https://discord.com/api/v10"
@@ -14,32 +91,87 @@ class DiscordSender:
             "Authorization": f"Bot {self.token}",
             "Content-Type": "application/json"
         }
+        delivery_config = self.config.get("discord_delivery", {})
+        self.max_retries = delivery_config.get("max_retries", 4)
+        self.timeout = delivery_config.get("timeout_seconds", 15)
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=delivery_config.get("pool_size", 4))
+        self.session.mount("https://", adapter)
 
-    def send_message(self, channel_id, content=None, embed=None):
+    def post_message(self, channel_id, payload):
         """
-        Sends a message to a Discord channel. 
-        Supports content text and/or an embed dictionary.
+        POSTs one message, waiting out rate-limit buckets and retrying 429s,
+        5xx responses and network errors. Returns the created message or
+        raises DiscordDeliveryError.
         """
         if not self.token:
-            print("Error: No Discord token found in config.")
-            return None
+            raise DiscordDeliveryError("No Discord token found in config.", retryable=False)
+
+        route = f"channels/{channel_id}/messages"
+        url = f"{self.base_url}/{route}"
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            wait = _buckets.wait_time(route)
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                last_error = str(e)
+                time.sleep(random.uniform(0, 2 ** attempt))
+                continue
+
+            _buckets.update(route, response.headers)
+            if response.status_code == 429:
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = {}
+                retry_after = float(body.get("retry_after") or response.headers.get("Retry-After") or 1)
+                is_global = bool(body.get("global")) or response.headers.get("X-RateLimit-Global") == "true"
+                _buckets.on_rate_limited(route, retry_after, is_global)
+                last_error = f"429 rate limited for {retry_after}s"
+                continue
+            if response.status_code >= 500:
+                last_error = f"{response.status_code}: {response.text}"
+                time.sleep(random.uniform(0, 2 ** attempt))
+                continue
+            if response.status_code >= 400:
+                raise DiscordDeliveryError(f"{response.status_code}: {response.text}", retryable=False)
+            return response.json()
+
+        raise DiscordDeliveryError(f"Gave up after {self.max_retries + 1} attempts: {last_error}")
 
-        url = f"{self.base_url}/channels/{channel_id}/messages"
+    def send_message(self, channel_id, content=None, embed=None, embeds=None):
+        """
+        Sends a message to a Discord channel. 
+        Supports content text and/or an embed dictionary (or a list of up to 10).
+        """
         payload = {}
         if content:
             payload["content"] = content
         if embed:
             payload["embeds"] = [embed]
+        if embeds:
+            payload["embeds"] = list(embeds)
         
         try:
-            response = requests.post(url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.HTTPError as e:
+            return self.post_message(channel_id, payload)
+        except DiscordDeliveryError as e:
             print(f"Failed to send Discord message: {e}")
-            if e.response is not None:
-                print(f"Response: {e.response.text}")
             return None
         except Exception as e:
             print(f"Error sending Discord message: {e}")
             return None
+
+    async def post_message_async(self, channel_id, payload):
+        """post_message() on a worker thread, so rate-limit waits don't block the event loop."""
+        return await asyncio.to_thread(self.post_message, channel_id, payload)
+
+    async def send_message_async(self, channel_id, content=None, embed=None, embeds=None):
+        return await asyncio.to_thread(self.send_message, channel_id, content, embed, embeds)
+
+    def close(self):
+        self.session.close()
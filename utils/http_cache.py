@@ -0,0 +1,226 @@
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from utils.settings import get_settings
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), "http_cache")
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache():
+    """The process-wide HTTPCache configured by the http_cache block of config.json."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                cache_config = get_settings().section("http_cache")
+                _shared = HTTPCache(
+                    directory=cache_config.get("directory", DEFAULT_CACHE_DIR),
+                    max_bytes=int(float(cache_config.get("max_mb", 200)) * 1024 * 1024),
+                    enabled=cache_config.get("enabled", True)
+                )
+    return _shared
+
+
+class HTTPCache:
+    """
+    On-disk cache for scraped pages, keyed by URL.
+
+    request_headers() adds If-None-Match / If-Modified-Since from the stored
+    validators; resolve() then turns a 200 or 304 into a parsed result.
+    A 304, or a 200 whose body hashes the same as the stored one, returns
+    the stored parse result without parsing again. get_fresh() skips the
+    request altogether for entries younger than a caller-chosen age.
+
+    Bodies are stored gzipped next to a SQLite index; once they add up to
+    more than `max_bytes` the least recently used are evicted. Parse
+    results are stored per `namespace`, so changing the parser (or its
+    backend) re-parses the stored body instead of reusing stale output.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=200 * 1024 * 1024, enabled=True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.stats = {
+            "fresh_hits": 0,
+            "revalidated": 0,
+            "unchanged": 0,
+            "misses": 0,
+            "evicted": 0,
+            "bytes_saved": 0,
+            "bytes_downloaded": 0,
+        }
+        if not enabled:
+            return
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                namespace TEXT,
+                parsed TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access)')
+
+    def _body_path(self, url):
+        return os.path.join(self.directory, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".html.gz")
+
+    def _entry(self, url):
+        row = self.conn.execute(
+            'SELECT etag, last_modified, body_hash, size, namespace, parsed, fetched_at FROM pages WHERE url = ?',
+            (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ("etag", "last_modified", "body_hash", "size", "namespace", "parsed", "fetched_at")
+        return dict(zip(keys, row))
+
+    def request_headers(self, url, headers=None):
+        """headers plus the conditional-GET validators stored for url."""
+        headers = dict(headers or {})
+        if not self.enabled:
+            return headers
+        with self.lock:
+            entry = self._entry(url)
+        if entry and os.path.exists(self._body_path(url)):
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get_fresh(self, url, max_age, namespace):
+        """The stored parse result if fetched less than max_age seconds ago, else None."""
+        if not self.enabled or not max_age:
+            return None
+        with self.lock:
+            entry = self._entry(url)
+            if not entry or time.time() - entry["fetched_at"] > max_age:
+                return None
+            parsed = self._stored_parse(url, entry, namespace, parse=None)
+            if parsed is None:
+                return None
+            self.stats["fresh_hits"] += 1
+            self.stats["bytes_saved"] += entry["size"]
+            self._touch(url)
+        return parsed
+
+    def resolve(self, url, response, parse, namespace):
+        """
+        Parse result for a 200 or 304 response to a request made with
+        request_headers(). Returns None for a 304 the cache can no longer
+        answer (entry evicted meanwhile).
+        """
+        if not self.enabled:
+            return parse(response.text) if response.status_code == 200 else None
+
+        if response.status_code == 304:
+            with self.lock:
+                entry = self._entry(url)
+                if entry is None:
+                    return None
+                self.stats["revalidated"] += 1
+                self.stats["bytes_saved"] += entry["size"]
+                parsed = self._stored_parse(url, entry, namespace, parse)
+                self._touch(url, fetched=True)
+            return parsed
+
+        body = response.text
+        body_bytes = body.encode("utf-8")
+        body_hash = hashlib.sha256(body_bytes).hexdigest()
+        with self.lock:
+            self.stats["bytes_downloaded"] += len(body_bytes)
+            entry = self._entry(url)
+            if entry and entry["body_hash"] == body_hash:
+                # Same bytes as last time: no need to parse again.
+                parsed = self._stored_parse(url, entry, namespace, parse)
+                if parsed is not None:
+                    self.stats["unchanged"] += 1
+                    self._touch(url, fetched=True)
+                    return parsed
+            self.stats["misses"] += 1
+
+        parsed = parse(body)
+        if parsed:
+            self._store(url, response, body_bytes, body_hash, namespace, parsed)
+        return parsed
+
+    def _stored_parse(self, url, entry, namespace, parse):
+        """Stored parse result for this namespace, re-parsing the stored body if it was made by another."""
+        if entry["namespace"] == namespace and entry["parsed"] is not None:
+            return json.loads(entry["parsed"])
+        if parse is None:
+            return None
+        try:
+            with gzip.open(self._body_path(url), "rt", encoding="utf-8") as f:
+                parsed = parse(f.read())
+        except OSError:
+            return None
+        self.conn.execute(
+            'UPDATE pages SET namespace = ?, parsed = ? WHERE url = ?', (namespace, json.dumps(parsed), url)
+        )
+        return parsed
+
+    def _store(self, url, response, body_bytes, body_hash, namespace, parsed):
+        headers = response.headers or {}
+        now = time.time()
+        with self.lock:
+            with gzip.open(self._body_path(url), "wb") as f:
+                f.write(body_bytes)
+            self.conn.execute(
+                '''INSERT OR REPLACE INTO pages
+                   (url, etag, last_modified, body_hash, size, namespace, parsed, fetched_at, last_access)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                (url, headers.get("ETag"), headers.get("Last-Modified"), body_hash, len(body_bytes),
+                 namespace, json.dumps(parsed), now, now)
+            )
+            self._evict()
+
+    def _touch(self, url, fetched=False):
+        now = time.time()
+        if fetched:
+            self.conn.execute('UPDATE pages SET last_access = ?, fetched_at = ? WHERE url = ?', (now, now, url))
+        else:
+            self.conn.execute('UPDATE pages SET last_access = ? WHERE url = ?', (now, url))
+
+    def _evict(self):
+        total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self.conn.execute('SELECT url, size FROM pages ORDER BY last_access').fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute('DELETE FROM pages WHERE url = ?', (url,))
+            try:
+                os.remove(self._body_path(url))
+            except OSError:
+                pass
+            total -= size
+            self.stats["evicted"] += 1
+
+    def summary(self):
+        with self.lock:
+            stats = dict(self.stats)
+        answered = stats["fresh_hits"] + stats["revalidated"] + stats["unchanged"]
+        lookups = answered + stats["misses"]
+        stats["hit_rate"] = answered / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(__file__), "llm_cache.db")
+
+
+def make_cache_key(*parts):
+    """Stable SHA-256 over any JSON-serialisable parts (model, tools, prompt, post...)."""
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LLMResultCache:
+    """
+    Persistent cache of LLM tool results keyed by a content hash.
+
+    Entries expire after `ttl_seconds`; once more than `max_entries` are
+    stored the least recently used are evicted. Each entry remembers the
+    latency and token usage of the call that produced it, so hits can be
+    reported as Bedrock time and tokens saved.
+
+    Lives in its own SQLite file so it never contends with jobs.db.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=30 * 24 * 3600, max_entries=20000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_results (
+                cache_key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                latency REAL DEFAULT 0,
+                input_tokens INTEGER DEFAULT 0,
+                output_tokens INTEGER DEFAULT 0
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS llm_results_last_access ON llm_results (last_access)')
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evicted": 0,
+            "latency_saved": 0.0,
+            "input_tokens_saved": 0,
+            "output_tokens_saved": 0,
+            "latency_spent": 0.0,
+            "input_tokens_spent": 0,
+            "output_tokens_spent": 0,
+        }
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT result, created_at, latency, input_tokens, output_tokens FROM llm_results WHERE cache_key = ?',
+                (key,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            result, created_at, latency, input_tokens, output_tokens = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self.conn.execute('DELETE FROM llm_results WHERE cache_key = ?', (key,))
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self.conn.execute('UPDATE llm_results SET last_access = ? WHERE cache_key = ?', (now, key))
+            self.stats["hits"] += 1
+            self.stats["latency_saved"] += latency or 0.0
+            self.stats["input_tokens_saved"] += input_tokens or 0
+            self.stats["output_tokens_saved"] += output_tokens or 0
+        return json.loads(result)
+
+    def put(self, key, result, latency=0.0, usage=None):
+        usage = usage or {}
+        now = time.time()
+        with self.lock:
+            self.stats["latency_spent"] += latency
+            self.stats["input_tokens_spent"] += usage.get("inputTokens", 0)
+            self.stats["output_tokens_spent"] += usage.get("outputTokens", 0)
+            self.conn.execute(
+                '''INSERT OR REPLACE INTO llm_results
+                   (cache_key, result, created_at, last_access, latency, input_tokens, output_tokens)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                (key, json.dumps(result), now, now, latency,
+                 usage.get("inputTokens", 0), usage.get("outputTokens", 0))
+            )
+            self._evict()
+
+    def _evict(self):
+        if not self.max_entries:
+            return
+        count = self.conn.execute('SELECT COUNT(*) FROM llm_results').fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self.conn.execute(
+                'DELETE FROM llm_results WHERE cache_key IN '
+                '(SELECT cache_key FROM llm_results ORDER BY last_access LIMIT ?)',
+                (overflow,)
+            )
+            self.stats["evicted"] += overflow
+
+    def summary(self):
+        with self.lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,132 @@
+import math
+from collections import OrderedDict
+
+
+class BloomFilter:
+    """
+    Plain bit-array Bloom filter. Answers "definitely not present" or
+    "maybe present"; never gives a false negative.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(int(capacity), 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Kirsch-Mitzenmacher double hashing: k positions from one 64-bit
+        # hash. str hashes are salted per process, which is fine for a
+        # filter that only ever lives in memory.
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        # Unrolled rather than all(_positions()): this is the hot path, and
+        # most absent keys fail on the first probe.
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        bits, num_bits = self.bits, self.num_bits
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % num_bits
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+
+class MembershipCache:
+    """
+    In-process front cache for "have we seen this ID?" checks.
+
+    A Bloom filter answers negatives without touching storage; a bounded
+    LRU answers recent positives. Anything else (a Bloom false positive or
+    an evicted positive) is a miss and the caller must ask the database.
+
+    Not thread-safe on its own; utils.database guards it with its lock.
+    """
+
+    def __init__(self, name, capacity=200_000, lru_size=100_000, error_rate=0.001):
+        self.name = name
+        self.capacity = capacity
+        self.lru_size = lru_size
+        self.error_rate = error_rate
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.recent = OrderedDict()
+        self.loaded = False
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def load(self, keys):
+        """Warm-starts the cache from every ID already in storage."""
+        keys = list(keys)
+        # Size the filter with headroom so the false-positive rate holds
+        # for a good while after startup.
+        self.bloom = BloomFilter(max(self.capacity, 2 * len(keys)), self.error_rate)
+        self.recent.clear()
+        for key in keys:
+            self.add(key)
+        self.loaded = True
+
+    def clear(self):
+        """Drops all keys; lookups go to storage until the next load()."""
+        self.bloom = BloomFilter(self.capacity, self.error_rate)
+        self.recent.clear()
+        self.loaded = False
+
+    def add(self, key):
+        """Records a key that has just been written to storage."""
+        key = str(key)
+        # Past bloom capacity the false-positive rate climbs; the next
+        # load() resizes. Until then the extra misses fall through to SQLite.
+        self.bloom.add(key)
+        self.remember(key)
+
+    def remember(self, key):
+        """Promotes a key the database confirmed as seen into the LRU."""
+        key = str(key)
+        self.recent[key] = True
+        self.recent.move_to_end(key)
+        if len(self.recent) > self.lru_size:
+            self.recent.popitem(last=False)
+
+    def lookup(self, key):
+        """
+        Returns True (seen), False (definitely unseen) or None (unknown,
+        ask the database).
+        """
+        key = str(key)
+        # The LRU first: a positive costs one dict lookup instead of
+        # every Bloom probe.
+        if key in self.recent:
+            self.recent.move_to_end(key)
+            self.hits += 1
+            return True
+        if key not in self.bloom:
+            self.negative_hits += 1
+            return False
+        self.misses += 1
+        return None
+
+    def stats(self):
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "name": self.name,
+            "positive_hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+            "bloom_items": self.bloom.count,
+            "bloom_capacity": self.bloom.capacity,
+            "lru_items": len(self.recent),
+        }
@@ -1,19 +1,109 @@
-import psycopg2
-from psycopg2.extras import RealDictCursor
-import json
-import os
+import threading
+import time
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
 
+from utils.settings import get_settings
+
+
+def _psycopg2():
+    """psycopg2 with its pool and extras, imported on first use so importing this module stays cheap."""
+    import psycopg2
+    import psycopg2.extras
+    import psycopg2.pool
+    return psycopg2
+
+
+def _connection_errors():
+    # Errors that mean the server connection itself is gone, as opposed to a
+    # bad statement. Only these trigger a reconnect-and-retry.
+    psycopg2 = _psycopg2()
+    return (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+INSERT_INTERVIEW = """
+    INSERT INTO public."Interview" (
+        id, "companyId", "userId", "jobRoleId", slug, title, location, date, difficulty, 
+        "noOfRounds", "interviewProcess", "preparationSources", "overallRating", 
+        "isAnonymous", status, "offerStatus", "createdAt", "updatedAt", "createdBy", "updatedBy"
+    ) VALUES (
+        %(id)s, %(companyId)s, %(userId)s, %(jobRoleId)s, %(slug)s, %(title)s, %(location)s, %(date)s, %(difficulty)s,
+        %(noOfRounds)s, %(interviewProcess)s, %(preparationSources)s, %(overallRating)s,
+        %(isAnonymous)s, %(status)s, %(offerStatus)s, NOW(), NOW(), 'system', 'system'
+    )
+"""
+
+# execute_values expands the single %s into one row per round using the template.
+INSERT_INTERVIEW_ROUNDS = """
+    INSERT INTO public."InterviewRound" (
+        id, "interviewId", name, duration, difficulty, experience, "keyTakeaways", 
+        "orderIndex", "createdAt", "updatedAt"
+    ) VALUES %s
+"""
+INTERVIEW_ROUND_TEMPLATE = """(
+    %(id)s, %(interviewId)s, %(name)s, %(duration)s, %(difficulty)s, %(experience)s, %(keyTakeaways)s,
+    %(orderIndex)s, NOW(), NOW()
+)"""
+INSERT_INTERVIEW_ROUND = INSERT_INTERVIEW_ROUNDS.replace("%s", INTERVIEW_ROUND_TEMPLATE)
+
+UPSERT_COMPANY = """
+    INSERT INTO public."Company" (
+        id, name, slug, description, website, "logoUrl", "updatedAt", "createdBy", "updatedBy", "createdAt"
+    ) VALUES (%s, %s, %s, %s, %s, %s, NOW(), 'system', 'system', NOW())
+    ON CONFLICT (slug) DO UPDATE SET slug = EXCLUDED.slug
+    RETURNING *
+"""
+
+# slug -> (company row, expiry). Module-level so it survives the PostgresDB
+# instance that run_scraper creates each cycle.
+_company_cache = {}
+_company_cache_lock = threading.Lock()
+
+def _company_cache_get(slug):
+    with _company_cache_lock:
+        entry = _company_cache.get(slug)
+        if entry is None:
+            return None
+        company, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del _company_cache[slug]
+            return None
+        return company
+
+def _company_cache_put(slug, company, ttl):
+    if company is None or ttl <= 0:
+        return
+    with _company_cache_lock:
+        _company_cache[slug] = (company, time.monotonic() + ttl)
+
 class PostgresDB:
     def __init__(self):
-        config_path = os.path.join(os.path.dirname(__file__), "config.json")
-        with open(config_path, "r") as f:
-            config = json.load(f)
-            self.db_config = config["postgres"]
-        
-    def get_connection(self):
-        return psycopg2.connect(
+        self.db_config = get_settings()["postgres"]
+
+        self.pool_min = int(self.db_config.get("pool_min", 1))
+        self.pool_max = int(self.db_config.get("pool_max", 5))
+        # Idle connections older than this are pinged before being handed out.
+        self.health_check_interval = float(self.db_config.get("health_check_interval", 30))
+        self.pool_timeout = float(self.db_config.get("pool_timeout", 30))
+        self.company_cache_ttl = float(self.db_config.get("company_cache_ttl", 3600))
+
+        self.pool = None
+        self._pool_lock = threading.Lock()
+        # ThreadedConnectionPool raises instead of waiting when exhausted;
+        # the semaphore turns that into a bounded wait we can measure.
+        self._slots = threading.BoundedSemaphore(self.pool_max)
+        self._last_used = {}
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "acquisitions": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0,
+            "health_check_failures": 0,
+            "reconnects": 0,
+        }
+
+    def _connect_kwargs(self):
+        return dict(
             host=self.db_config["host"],
             user=self.db_config["user"],
             password=self.db_config["password"],
@@ -21,54 +111,160 @@ class PostgresDB:
             port=self.db_config["port"]
         )
 
-    def fetch_one(self, query, params=None):
-        conn = self.get_connection()
+    def get_connection(self):
+        """Opens a dedicated, unpooled connection. Prefer connection()."""
+        return _psycopg2().connect(**self._connect_kwargs())
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self.pool is None or self.pool.closed:
+                self.pool = _psycopg2().pool.ThreadedConnectionPool(self.pool_min, self.pool_max, **self._connect_kwargs())
+            return self.pool
+
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        # Freshly opened connections have no history and need no ping.
+        if last_used is None or time.monotonic() - last_used < self.health_check_interval:
+            return True
         try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except _connection_errors():
+            return False
+
+    def _acquire(self):
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=self.pool_timeout):
+            raise _psycopg2().pool.PoolError(f"Timed out after {self.pool_timeout}s waiting for a Postgres connection")
+        waited = time.monotonic() - start
+        with self._stats_lock:
+            self.stats["acquisitions"] += 1
+            self.stats["wait_total"] += waited
+            self.stats["wait_max"] = max(self.stats["wait_max"], waited)
+
+        pool = self._get_pool()
+        try:
+            conn = pool.getconn()
+            if not self._is_healthy(conn):
+                with self._stats_lock:
+                    self.stats["health_check_failures"] += 1
+                self._last_used.pop(id(conn), None)
+                pool.putconn(conn, close=True)
+                conn = pool.getconn()
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, conn, discard=False):
+        try:
+            if discard:
+                self._last_used.pop(id(conn), None)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+            self._get_pool().putconn(conn, close=discard or bool(conn.closed))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows a pooled connection for the duration of the block. The
+        connection goes back to the pool afterwards (rolled back if a
+        transaction was left open), or is discarded if it broke.
+        """
+        conn = self._acquire()
+        discard = False
+        try:
+            yield conn
+        except _connection_errors():
+            discard = True
+            raise
+        finally:
+            self._release(conn, discard=discard or bool(conn.closed))
+
+    def _run(self, fn):
+        # Retry once on a fresh connection if the pooled one died under us.
+        try:
+            with self.connection() as conn:
+                return fn(conn)
+        except _connection_errors() as e:
+            print(f"Postgres connection lost ({e}). Reconnecting...")
+            with self._stats_lock:
+                self.stats["reconnects"] += 1
+            with self.connection() as conn:
+                return fn(conn)
+
+    def pool_stats(self):
+        """Pool wait-time and reconnect counters since this object was created."""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        acquisitions = stats["acquisitions"]
+        return {
+            **stats,
+            "wait_avg": stats["wait_total"] / acquisitions if acquisitions else 0.0,
+            "pool_min": self.pool_min,
+            "pool_max": self.pool_max,
+        }
+
+    def close(self):
+        """Closes every pooled connection. The pool is re-created on next use."""
+        with self._pool_lock:
+            if self.pool is not None and not self.pool.closed:
+                self.pool.closeall()
+            self.pool = None
+            self._last_used.clear()
+
+    def fetch_one(self, query, params=None):
+        def run(conn):
+            with conn.cursor(cursor_factory=_psycopg2().extras.RealDictCursor) as cur:
                 cur.execute(query, params)
                 return cur.fetchone()
-        finally:
-            conn.close()
+        return self._run(run)
 
     def fetch_all(self, query, params=None):
-        conn = self.get_connection()
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        def run(conn):
+            with conn.cursor(cursor_factory=_psycopg2().extras.RealDictCursor) as cur:
                 cur.execute(query, params)
                 return cur.fetchall()
-        finally:
-            conn.close()
+        return self._run(run)
+
+    def execute_returning(self, query, params=None):
+        """Executes a write with a RETURNING clause, commits, and returns the first row."""
+        def run(conn):
+            with conn.cursor(cursor_factory=_psycopg2().extras.RealDictCursor) as cur:
+                cur.execute(query, params)
+                row = cur.fetchone()
+                conn.commit()
+                return row
+        return self._run(run)
 
     def execute_commit(self, query, params=None):
-        conn = self.get_connection()
-        try:
+        def run(conn):
             with conn.cursor() as cur:
                 cur.execute(query, params)
                 conn.commit()
                 return cur.rowcount
-        finally:
-            conn.close()
+        return self._run(run)
 
     def get_or_create_company(self, name, slug, description=None, website=None, logo_url=None):
-        # Check if exists
-        query = "SELECT * FROM public.\"Company\" WHERE slug = %s"
-        company = self.fetch_one(query, (slug,))
-        
-        if company:
-            return company
+        cached = _company_cache_get(slug)
+        if cached:
+            return cached
 
-        # Create new
+        # Single round-trip upsert. The no-op DO UPDATE (rather than DO
+        # NOTHING) makes RETURNING yield the existing row on conflict, and
+        # the unique slug index makes concurrent workers converge on one row.
         new_id = str(uuid.uuid4())
-        insert_query = """
-            INSERT INTO public."Company" (
-                id, name, slug, description, website, "logoUrl", "updatedAt", "createdBy", "updatedBy", "createdAt"
-            ) VALUES (%s, %s, %s, %s, %s, %s, NOW(), 'system', 'system', NOW())
-        """
-        self.execute_commit(insert_query, (
+        company = self.execute_returning(UPSERT_COMPANY, (
             new_id, name, slug, description or "", website, logo_url
         ))
-        
-        return self.fetch_one(query, (slug,))
+        _company_cache_put(slug, company, self.company_cache_ttl)
+        return company
 
     def get_job_role_by_name(self, name):
          # Try exact match or ilike
@@ -86,36 +282,44 @@ class PostgresDB:
 
     def create_interview(self, data):
         new_id = str(uuid.uuid4())
-        query = """
-            INSERT INTO public."Interview" (
-                id, "companyId", "userId", "jobRoleId", slug, title, location, date, difficulty, 
-                "noOfRounds", "interviewProcess", "preparationSources", "overallRating", 
-                "isAnonymous", status, "offerStatus", "createdAt", "updatedAt", "createdBy", "updatedBy"
-            ) VALUES (
-                %(id)s, %(companyId)s, %(userId)s, %(jobRoleId)s, %(slug)s, %(title)s, %(location)s, %(date)s, %(difficulty)s,
-                %(noOfRounds)s, %(interviewProcess)s, %(preparationSources)s, %(overallRating)s,
-                %(isAnonymous)s, %(status)s, %(offerStatus)s, NOW(), NOW(), 'system', 'system'
-            )
-        """
         data['id'] = new_id
         # Use a default user ID if none provided (e.g. system bot user) - TO BE HANDLED BY CALLER or Config
         # For now, we assume the caller provides a valid userId or we pick one.
         # IF userId is missing, we might need a fallback.
         
-        self.execute_commit(query, data)
+        self.execute_commit(INSERT_INTERVIEW, data)
         return new_id
 
     def create_interview_round(self, data):
         new_id = str(uuid.uuid4())
-        query = """
-            INSERT INTO public."InterviewRound" (
-                id, "interviewId", name, duration, difficulty, experience, "keyTakeaways", 
-                "orderIndex", "createdAt", "updatedAt"
-            ) VALUES (
-                %(id)s, %(interviewId)s, %(name)s, %(duration)s, %(difficulty)s, %(experience)s, %(keyTakeaways)s,
-                %(orderIndex)s, NOW(), NOW()
-            )
-        """
         data['id'] = new_id
-        self.execute_commit(query, data)
+        self.execute_commit(INSERT_INTERVIEW_ROUND, data)
         return new_id
+
+    def save_interview_with_rounds(self, interview, rounds):
+        """
+        Writes an Interview and all of its InterviewRound rows in a single
+        transaction: one INSERT for the parent, one multi-row INSERT for the
+        rounds. Either everything is stored or nothing is.
+        Returns the new interview id.
+        """
+        interview_id = str(uuid.uuid4())
+        interview['id'] = interview_id
+        for round_data in rounds:
+            round_data['id'] = str(uuid.uuid4())
+            round_data['interviewId'] = interview_id
+
+        def run(conn):
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(INSERT_INTERVIEW, interview)
+                    if rounds:
+                        _psycopg2().extras.execute_values(cur, INSERT_INTERVIEW_ROUNDS, rounds,
+                                       template=INTERVIEW_ROUND_TEMPLATE, page_size=len(rounds))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        self._run(run)
+        return interview_id
@@ -0,0 +1,49 @@
+import json
+import os
+import threading
+
+# SCRAPER_CONFIG overrides the path, e.g. for a mounted secret in a container.
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config.json")
+
+_settings = None
+_settings_lock = threading.Lock()
+
+
+class Settings:
+    """
+    config.json parsed once and shared by every module in the process.
+    Behaves like the dict it wraps (get, [], in); section() returns a
+    nested block or {} when it is missing.
+    """
+
+    def __init__(self, data, path, found=True):
+        self.data = data
+        self.path = path
+        self.found = found
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def section(self, name):
+        return self.data.get(name) or {}
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __contains__(self, key):
+        return key in self.data
+
+
+def get_settings():
+    """The process-wide Settings, loading config.json on first call."""
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                path = os.environ.get("SCRAPER_CONFIG", DEFAULT_CONFIG_PATH)
+                try:
+                    with open(path, "r") as f:
+                        _settings = Settings(json.load(f), path)
+                except FileNotFoundError:
+                    _settings = Settings({}, path, found=False)
+    return _settings